@@ -2,97 +2,362 @@
 
 # TODO Make test for helpers and utils
 
+import time
+
+_STARTED_AT = time.perf_counter()
+
 import argparse
+import atexit
 import os
-import socket
 import sys
 
+from translation import instrument
+from translation.abc_translate import TranslateExceptionABC
 from utils.settings import ConfigSettings
+from utils.textinput import is_text_input, open_input, pull_lines
 
 APP_ID = "babelPy"
 APP_DESC = "An easy tool for those who would not survive in the tower of Babel"
+APP_PATH = os.path.dirname(os.path.realpath(__file__))
+APP_ICON_PATH = APP_PATH + "/resources/icons/transClipper-outline-64.png"
+
 
 # TODO - Parse input!
 
-arg_parser = argparse.ArgumentParser(description=APP_DESC, epilog="Enjoy!")
-arg_parser.add_argument('-a', '--api-key', metavar='YourApiKey', nargs='?',
-                        help='Your API key for target (or default) backend')
-arg_parser.add_argument('-b', '--backend', metavar='yandex|other', nargs='?',
-                        help='Target translate backend (Default: yandex)')
-arg_parser.add_argument('-c', '--config-file', metavar='~/.babelPy.json',
-                        nargs='?', help='Path to config file (load and save)')
-arg_parser.add_argument('-s', '--source-lang', metavar='en|es', nargs='?',
-                        help='Give a source language (avoids auto detection)')
-arg_parser.add_argument('-t', '--target-lang', metavar='en|es', nargs='?',
-                        help='Give a target language (overrides config)')
-arg_parser.add_argument('-m', '--message', metavar='Text to translate',
-                        nargs='?', help='Pass directly the actual text to '
-                                        'translate as an argument (overrides'
-                                        ' clipboard and selection)')
-arg_parser.add_argument('-i', '--input', metavar='clipboard|selection',
-                        nargs='?', help='From where the text has to be taken')
-arg_parser.add_argument('-o', '--output', metavar='stdout|notify|dialog|none',
-                        nargs='?', help='Where to (out)put the translation')
-arg_parser.add_argument('-x', '--exchange', action='store_true',
-                        help='Exchange/paste translation to clipboard')
-arg_parser.add_argument('--save-config', action='store_true',
-                        help='Save a config file at default (or -c given) path'
-                             ', based on default or stored/saved settings.')
-args = arg_parser.parse_args()
-
-default_cfg_path = os.path.expanduser("~") + "/.babelPy.json"
-CONFIG_FILE_PATH = args.config_file if args.config_file else default_cfg_path
-settings = ConfigSettings(CONFIG_FILE_PATH)
-if args.save_config:
-    return_code = settings.save(args)
-    sys.exit(return_code)
-
-INPUT_TYPE = args.input if args.input else settings.input
-if not args.message:
+def build_arg_parser():
+    """Returns the command line argument parser"""
+    arg_parser = argparse.ArgumentParser(description=APP_DESC,
+                                         epilog="See 'babelPy tree -h' to "
+                                                "translate trees of .po, "
+                                                ".srt and JSON files. "
+                                                "Enjoy!")
+    arg_parser.add_argument('-a', '--api-key', metavar='YourApiKey',
+                            nargs='?', help='Your API key for target (or '
+                                            'default) backend')
+    arg_parser.add_argument('-b', '--backend', metavar='yandex|offline|other',
+                            nargs='?', help='Target translate backend '
+                                            '(Default: yandex)')
+    arg_parser.add_argument('-c', '--config-file', metavar='~/.babelPy.json',
+                            nargs='?', help='Path to config file (load and '
+                                            'save)')
+    arg_parser.add_argument('-s', '--source-lang', metavar='en|es', nargs='?',
+                            help='Give a source language (avoids auto '
+                                 'detection)')
+    arg_parser.add_argument('-t', '--target-lang', metavar='en|es|en,de,fr',
+                            nargs='?', help='Give a target language, or '
+                                            'many (comma separated, JSON '
+                                            'lines output) (overrides '
+                                            'config)')
+    arg_parser.add_argument('-m', '--message', metavar='Text to translate',
+                            nargs='?', help='Pass directly the actual text to '
+                                            'translate as an argument '
+                                            '(overrides clipboard and '
+                                            'selection)')
+    arg_parser.add_argument('-i', '--input',
+                            metavar='clipboard|selection|file:PATH|-',
+                            nargs='?', help='From where the text has to be '
+                                            'taken (a file or stdin is '
+                                            'translated line by line in '
+                                            'batches)')
+    arg_parser.add_argument('-o', '--output',
+                            metavar='stdout|notify|dialog|none', nargs='?',
+                            help='Where to (out)put the translation')
+    arg_parser.add_argument('-x', '--exchange', action='store_true',
+                            help='Exchange/paste translation to clipboard')
+    arg_parser.add_argument('--format', metavar='plain|html|markdown',
+                            choices=('plain', 'html', 'markdown'),
+                            default='plain', help='Translate only the text '
+                                                  'of an HTML/Markdown '
+                                                  'document (Default: '
+                                                  'plain)')
+    arg_parser.add_argument('--stream', action='store_true',
+                            help='Translate a file:PATH or - (stdin) input '
+                                 'chunk by chunk, writing results to stdout '
+                                 'as ready')
+    arg_parser.add_argument('--max-in-flight', metavar='4', type=int,
+                            default=4, help='Max concurrent requests (and '
+                                            'pooled connections) in --stream '
+                                            'mode')
+    arg_parser.add_argument('--timeout', metavar='SECONDS', type=float,
+                            help='Network timeout for backend requests')
+    arg_parser.add_argument('--proxy', metavar='URL',
+                            help='Proxy used for backend requests')
+    arg_parser.add_argument('--retries', metavar='2', type=int, default=2,
+                            help='Retries (with jittered exponential backoff)'
+                                 ' for failed backend requests')
+    arg_parser.add_argument('--watch', action='store_true',
+                            help='Keep running, translating each new '
+                                 'selection (or clipboard, see -i) content')
+    arg_parser.add_argument('--watch-interval', metavar='0.1', type=float,
+                            default=0.1, help='Seconds between selection '
+                                              'checks in --watch mode')
+    arg_parser.add_argument('--daemon', action='store_true',
+                            help='Keep running, serving translations on a '
+                                 'local UNIX socket')
+    arg_parser.add_argument('--client', action='store_true',
+                            help='Forward the translation request to a '
+                                 'running --daemon instead of translating '
+                                 'in-process')
+    arg_parser.add_argument('--socket', metavar='PATH',
+                            help='UNIX socket path for --daemon and --client')
+    arg_parser.add_argument('--batch-window', type=float, default=0.005,
+                            metavar='SECONDS',
+                            help='Time concurrent --daemon requests wait to '
+                                 'be sent as one batch, by source language '
+                                 '(detected offline when not given; 0 '
+                                 'disables)')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Bypass the on-disk translation cache')
+    arg_parser.add_argument('--cache-stats', action='store_true',
+                            help='Show translation cache statistics and exit')
+    arg_parser.add_argument('--tm', action='store_true',
+                            help='Reuse (and store) segments from the '
+                                 'translation memory, equal but for numbers '
+                                 'and placeholders')
+    arg_parser.add_argument('--tm-suggest', action='store_true',
+                            help='Show similar segments of the translation '
+                                 'memory and their translations, and exit')
+    arg_parser.add_argument('--tm-import', metavar='FILE.tmx',
+                            help='Add TMX file segments to the translation '
+                                 'memory and exit')
+    arg_parser.add_argument('--tm-export', metavar='FILE.tmx',
+                            help='Write the translation memory to a TMX '
+                                 'file and exit')
+    arg_parser.add_argument('--quota', action='store_true',
+                            help='Show API usage for the current day and '
+                                 'exit')
+    arg_parser.add_argument('--trace', metavar='FILE.json',
+                            help='Write per-phase spans as Chrome trace '
+                                 'event JSON (chrome://tracing) on exit')
+    arg_parser.add_argument('--metrics', metavar='FILE.prom',
+                            help='Write request/cache/error metrics in '
+                                 'Prometheus text format (periodically in '
+                                 '--daemon and --watch modes)')
+    arg_parser.add_argument('--profile-startup', action='store_true',
+                            help='Report per-phase import and init times to '
+                                 'stderr')
+    arg_parser.add_argument('--save-config', action='store_true',
+                            help='Save a config file at default (or -c given) '
+                                 'path, based on default or stored/saved '
+                                 'settings.')
+    return arg_parser
+
+
+def build_tree_arg_parser():
+    """Returns the argument parser of the tree subcommand"""
+    arg_parser = argparse.ArgumentParser(
+        prog="babelPy tree", description="Translate new or changed entries "
+                                         "of the .po/.pot, .srt and JSON "
+                                         "files under SRC into DST")
+    arg_parser.add_argument('source_root', metavar='SRC',
+                            help='Directory with files to translate')
+    arg_parser.add_argument('target_root', metavar='DST',
+                            help='Directory receiving translated files (and '
+                                 'the manifest)')
+    arg_parser.add_argument('-t', '--target-lang', metavar='de',
+                            required=True, help='Target language')
+    arg_parser.add_argument('-s', '--source-lang', metavar='en',
+                            default='auto', help='Source language')
+    arg_parser.add_argument('-b', '--backend', metavar='yandex|offline|other',
+                            help='Target translate backend')
+    arg_parser.add_argument('-a', '--api-key', metavar='YourApiKey',
+                            help='Your API key for target backend')
+    arg_parser.add_argument('-c', '--config-file', metavar='~/.babelPy.json',
+                            help='Path to config file')
+    arg_parser.add_argument('-j', '--jobs', metavar='4', type=int, default=4,
+                            help='Files translated at once')
+    arg_parser.add_argument('--batch-size', metavar='50', type=int,
+                            default=50, help='Entries sent per request')
+    arg_parser.add_argument('--timeout', metavar='SECONDS', type=float,
+                            help='Network timeout for backend requests')
+    arg_parser.add_argument('--proxy', metavar='URL',
+                            help='Proxy used for backend requests')
+    arg_parser.add_argument('--retries', metavar='2', type=int, default=2,
+                            help='Retries for failed backend requests')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Bypass the on-disk translation cache')
+    arg_parser.add_argument('--tm', action='store_true',
+                            help='Use the translation memory')
+    return arg_parser
+
+
+class StartupProfiler:
+    """StartupProfiler - Records time spent on each startup phase"""
+
+    def __init__(self, enabled, started_at):
+        self.enabled = enabled
+        self.started_at = self.last_mark = started_at
+        self.phases = []
+
+    def mark(self, phase):
+        """Closes current phase, naming it with given phase name"""
+        now = time.perf_counter()
+        self.phases.append((phase, self.last_mark, now))
+        instrument.add_span(phase, self.last_mark, now)
+        self.last_mark = now
+
+    def replay(self):
+        """Records phases closed before instrumentation was enabled"""
+        for phase, started_at, ended_at in self.phases:
+            instrument.add_span(phase, started_at, ended_at)
+
+    def report(self):
+        if not self.enabled:
+            return
+        for phase, started_at, ended_at in self.phases:
+            print("[Profile] {0:<18} {1:8.2f} ms".format(
+                phase, (ended_at - started_at) * 1000), file=sys.stderr)
+        total = self.last_mark - self.started_at
+        print("[Profile] {0:<18} {1:8.2f} ms".format("total", total * 1000),
+              file=sys.stderr)
+        heavy_modules = [name for name in ("requests", "gi", "tkinter")
+                         if name in sys.modules]
+        print("[Profile] heavy modules loaded: " +
+              (", ".join(heavy_modules) or "none"), file=sys.stderr)
+
+
+def load_backend(backend):
+    """Imports (only) the helper class of the selected backend"""
+    from translation.registry import load_backend as load_registered
+
+    try:
+        return load_registered(backend)
+    except (ImportError, ValueError) as exception:
+        print("[Error] Could not load translate backend: " + backend)
+        print("[Error] -> {0}".format(exception))
+        sys.exit(1)
+
+
+def config_file_path(args):
+    default_cfg_path = os.path.expanduser("~") + "/.babelPy.json"
+    return args.config_file if args.config_file else default_cfg_path
+
+
+def config_base_path(args):
+    """Returns config file path without extension, used for sidecar files"""
+    return os.path.splitext(config_file_path(args))[0]
+
+
+def build_rate_limiter(args, settings):
+    """Returns the client-side rate limiter shared by all babelPy processes"""
+    from translation.ratelimit import RateLimiter
+
+    return RateLimiter(config_base_path(args) + ".quota.json",
+                       **settings.rate_limit)
+
+
+def open_memory(args, settings):
+    """Returns the translation memory stored next to the config file"""
+    from translation.memory import TranslationMemory
+
+    return TranslationMemory(config_base_path(args) + ".tmx",
+                             settings.memory.get("threshold"))
+
+
+def glossary_enabled(settings):
+    glossary = settings.glossary
+    return glossary.get("enabled", True) and \
+        bool(glossary.get("keep") or glossary.get("terms"))
+
+
+def open_glossary(args, settings):
+    """Returns the configured glossary (compiled next to config), or None"""
+    if not glossary_enabled(settings):
+        return None
+    from translation.glossary import Glossary
+
+    return Glossary(settings.glossary.get("keep"),
+                    settings.glossary.get("terms"),
+                    config_base_path(args) + ".glossary.json")
+
+
+def cache_backend(settings, backend):
+    """Returns the backend name translations are cached under"""
+    if not glossary_enabled(settings):
+        return backend
+    from translation.glossary import glossary_digest
+
+    # Cached translations are only valid for the glossary they used
+    return backend + "+glossary:" + glossary_digest(
+        settings.glossary.get("keep"), settings.glossary.get("terms"))[:12]
+
+
+def router_route(settings, route):
+    """Returns a router route, completed by the config of its backend"""
+    if not isinstance(route, dict):
+        route = {"backend": route}
+    resolved = dict(settings.backends.get(route["backend"], {}))
+    resolved.update(route)
+    return resolved
+
+
+def build_translator(args, settings, backend, api_key, cache, memory=None,
+                     batch_window=None, cache_missed=()):
+    """
+    Returns the (cached, resilient) helper for the selected backend,
+    cache_missed listing requests already looked up in vain in cache
+    """
+    translate_helper = load_backend(backend)
+    proxies = {"http": args.proxy, "https": args.proxy} if args.proxy else None
+    options = settings.backend_options(backend)
+    if backend == "router":
+        options["routes"] = [router_route(settings, route)
+                             for route in options.get("routes", [])]
+    options.update(pool_size=args.max_in_flight, timeout=args.timeout,
+                   proxies=proxies,
+                   limiter=build_rate_limiter(args, settings))
+    translator = translate_helper(api_key, **options)
+    if backend == "router":
+        instrument.register_gauges("babelpy_router", translator.stats)
+    translator.load_catalog(config_base_path(args) + "." + backend +
+                            ".langs.json")
+    glossary = open_glossary(args, settings)
+    if glossary is not None:
+        from translation.glossary import GlossaryTranslateHelper
+
+        translator = GlossaryTranslateHelper(translator, glossary)
+    from translation.resilience import ResilientTranslateHelper, RetryPolicy
+
+    translator = ResilientTranslateHelper(translator,
+                                          RetryPolicy(retries=args.retries))
+    instrument.register_gauges("babelpy_backend", translator.stats)
+    if batch_window:
+        from translation.batching import BatchingTranslateHelper
+
+        # Below memory and cache, so only their misses wait for a batch
+        translator = BatchingTranslateHelper(
+            translator, batch_window, max_concurrency=args.max_in_flight)
+        instrument.register_gauges("babelpy_batching", translator.stats)
+    if memory is not None:
+        from translation.memory import MemoryTranslateHelper
+
+        translator = MemoryTranslateHelper(translator, memory)
+    if cache:
+        from translation.cache import CachedTranslateHelper
+
+        translator = CachedTranslateHelper(translator, cache,
+                                           cache_backend(settings, backend),
+                                           cache_missed)
+    from translation.fanout import FanOutTranslateHelper
+
+    # Outermost, so each leg of a pivoted translation is cached on its own
+    return FanOutTranslateHelper(translator,
+                                 max_concurrency=args.max_in_flight)
+
+
+def pull_source_text(input_type):
     try:
         # noinspection PyUnresolvedReferences
         from utils.clipboard import pull_input
 
-        source_text = pull_input(INPUT_TYPE)
+        return pull_input(input_type)
     except ImportError as exception:
-        source_text = "[Error] Python module pyperclip not found!"
         print("[Error] Python module pyperclip not found!")
-        print("[Error] -> {0}") + exception.msg
+        print("[Error] -> {0}".format(exception.msg))
         sys.exit(1)
-else:
-    source_text = args.message
-
-TARGET_BACKEND = args.backend if args.backend else settings.backend
-if TARGET_BACKEND == "yandex":
-    from translation.yandex import YandexHelper as TranslateHelper, \
-        YandexHelperException, YandexTranslatorException
-
-API_KEY = args.api_key if args.api_key else settings.api_key
-translator = TranslateHelper(API_KEY)
-SOURCE_LANG = args.source_lang if args.source_lang else "auto"
-TARGET_LANG = args.target_lang if args.target_lang else settings.language
-
-try:
-    from requests.packages.urllib3.exceptions import ConnectionError
-
-    translation, direction = translator.translate(source_text,
-                                                  SOURCE_LANG,
-                                                  TARGET_LANG)
-except (ConnectionError, socket.error) as network_exception:
-    print("[Error] An connection error occurred while accessing the network.")
-    print("[Error] -> {0}".format(network_exception))
-    sys.exit(1)
-except (YandexHelperException, YandexTranslatorException) as translate_error:
-    print("[Error] An error occurred while requesting translation!")
-    print("[Error] -> " + translate_error.msg)
-    sys.exit(1)
 
-APP_PATH = os.path.dirname(os.path.realpath(__file__))
-APP_ICON_PATH = APP_PATH + "/resources/icons/transClipper-outline-64.png"
-
-OUTPUT_TYPE = args.output if args.output else settings.output
 
-if OUTPUT_TYPE == "notify":
+def notify_translation(translation, direction):
     try:
         from utils.notify import NotifyHelper
 
@@ -100,26 +365,430 @@ if OUTPUT_TYPE == "notify":
         notifier.notify(translation, "Translated " + direction.upper() + ":")
     except ImportError as exception:
         print("[Error] Module(s) Notify, pyperclip not found!")
-        print("[Error] -> {0}") + exception.msg
+        print("[Error] -> {0}".format(exception.msg))
         sys.exit(1)
-elif OUTPUT_TYPE == "dialog":
+
+
+def show_dialog(source_text, translation, target_lang, root_tk=None):
     try:
-        from utils.notify import TkDialogNotifier as TkDialog
+        from utils.dialog import TkDialogNotifier as TkDialog
 
-        TkDialog.show_dialog(APP_ID, source_text, translation, TARGET_LANG)
+        TkDialog.show_dialog(APP_ID, source_text, translation, target_lang,
+                             root_tk)
     except ImportError as exception:
         print("[Error] Python module(s) tkinter or pyperclip not found!")
-        print("[Error] -> {0}") + exception.msg
+        print("[Error] -> {0}".format(exception.msg))
         sys.exit(1)
-elif OUTPUT_TYPE == "stdout":
-    print(translation)
 
-if args.exchange or settings.exchange:
+
+def push_translation(translation):
     try:
         from utils.clipboard import push_clipboard
 
         push_clipboard(translation)
     except ImportError as exception:
         print("[Error] Python pyperclip module not found!")
-        print("[Error] -> {0}") + exception.msg
+        print("[Error] -> {0}".format(exception.msg))
         sys.exit(1)
+
+
+def translate_lines(translator, source_lines, source_lang, target_lang):
+    """Batch translates non empty lines, returns (translation, direction)"""
+    non_empty = [line for line in source_lines if line.strip()]
+    translated = iter(translator.translate_batch(non_empty, source_lang,
+                                                 target_lang))
+    translated_lines = [next(translated) if line.strip() else (line, "")
+                        for line in source_lines]
+    translation = "\n".join(line for line, _ in translated_lines)
+    direction = next((lang for _, lang in translated_lines if lang),
+                     target_lang)
+    return translation, direction
+
+
+def format_translations(results):
+    """Returns multi-target results as '[target] translation' lines"""
+    return "\n".join("[{0}] {1}".format(result["target"],
+                                        result.get("translation",
+                                                   result.get("error")))
+                     for result in results)
+
+
+def output_translations(output_type, source_text, results):
+    """Outputs multi-target results, JSON lines when output is stdout"""
+    if output_type == "stdout":
+        import json
+
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    else:
+        output_translation(output_type, source_text,
+                           format_translations(results), "many",
+                           ",".join(result["target"] for result in results))
+
+
+def output_translation(output_type, source_text, translation, direction,
+                       target_lang, root_tk=None):
+    with instrument.span("output." + output_type):
+        if output_type == "notify":
+            notify_translation(translation, direction)
+        elif output_type == "dialog":
+            show_dialog(source_text, translation, target_lang, root_tk)
+        elif output_type == "stdout":
+            print(translation, flush=True)
+
+
+def run_watch(translator, input_type, output_type, source_lang, target_lang,
+              exchange, interval):
+    try:
+        from utils.watch import SelectionWatcher
+    except ImportError as exception:
+        print("[Error] Python module tkinter not found!")
+        print("[Error] -> {0}".format(exception.msg))
+        return 1
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Translations wait on the network, off the Tk thread so the dialog
+    # and the selection polling stay responsive (one at a time, in order)
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    def show_translation(source_text, translation, direction):
+        output_translation(output_type, source_text, translation, direction,
+                           target_lang, watcher.root_tk)
+        if exchange:
+            watcher.push_clipboard(translation)
+
+    def translate_selection(source_text):
+        try:
+            with instrument.span("watch.translate"):
+                translation, direction = translator.translate(source_text,
+                                                              source_lang,
+                                                              target_lang)
+        except (OSError, TranslateExceptionABC) as translate_error:
+            print("[Error] An error occurred while requesting translation!")
+            print("[Error] -> {0}".format(translate_error))
+            return
+        # Tk widgets are only used from the thread running its mainloop
+        watcher.root_tk.after(0, show_translation, source_text, translation,
+                              direction)
+
+    def on_selection_change(source_text):
+        executor.submit(translate_selection, source_text)
+
+    watcher = SelectionWatcher(on_selection_change, input_type, interval)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False)
+    return 0
+
+
+def run_daemon(translator, socket_path):
+    import signal
+    import threading
+
+    from utils.daemon import TranslateDaemon
+
+    def on_daemon_translation(request, translation, direction):
+        if request.get("output") == "notify":
+            notify_translation(translation, direction)
+
+    with TranslateDaemon(socket_path, translator,
+                         on_daemon_translation) as daemon:
+
+        def on_terminate(signal_number, frame):
+            # shutdown() waits for serve_forever() to return, so it can not
+            # run in this (the serving) thread; exiting normally then closes
+            # the socket and runs the atexit hooks (memory, metrics)
+            threading.Thread(target=daemon.shutdown).start()
+
+        signal.signal(signal.SIGTERM, on_terminate)
+        print("Serving translations at: " + socket_path)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def run_tree(argv):
+    """babelPy tree SRC DST -t LANG - Incremental tree translation"""
+    args = build_tree_arg_parser().parse_args(argv)
+    args.max_in_flight = args.jobs
+    settings = ConfigSettings(config_file_path(args))
+    backend = args.backend if args.backend else settings.backend
+    api_key = args.api_key if args.api_key else settings.api_key
+    cache = None
+    if settings.cache.get("enabled", True) and not args.no_cache:
+        from translation.cache import TranslationCache
+
+        cache = TranslationCache(config_base_path(args) + ".cache.sqlite",
+                                 settings.cache.get("max_entries"),
+                                 settings.cache.get("max_age"))
+    memory = None
+    if settings.memory.get("enabled") or args.tm:
+        memory = open_memory(args, settings)
+        atexit.register(memory.save)
+    from utils.tree import TreeTranslator
+
+    started_at = time.perf_counter()
+    tree = TreeTranslator(build_translator(args, settings, backend, api_key,
+                                           cache, memory),
+                          args.source_root, args.target_root,
+                          args.source_lang, args.target_lang, args.jobs,
+                          args.batch_size)
+
+    def on_tree_error(message):
+        print("[Error] -> " + message, file=sys.stderr)
+
+    try:
+        stats = tree.run(on_tree_error)
+    except KeyboardInterrupt:
+        print("[Warning] Interrupted, finished work was saved to: " +
+              tree.manifest_path, file=sys.stderr)
+        return 130
+    print("{0} files translated ({1} unchanged, {2} failed): {3} entries "
+          "translated, {4} reused, in {5:.2f} s".format(
+              stats["files"], stats["unchanged_files"],
+              stats["failed_files"], stats["translated"], stats["reused"],
+              time.perf_counter() - started_at))
+    return 1 if stats["failed_files"] else 0
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["tree"]:
+        return run_tree(argv[1:])
+    profiler = StartupProfiler("--profile-startup" in argv, _STARTED_AT)
+    profiler.mark("base imports")
+    args = build_arg_parser().parse_args(argv)
+    profiler.mark("argparse")
+    if args.trace or args.metrics:
+        recorder = instrument.enable(bool(args.trace), _STARTED_AT)
+        profiler.replay()
+        if args.trace:
+            atexit.register(recorder.write_trace, args.trace)
+        if args.metrics:
+            atexit.register(recorder.write_metrics, args.metrics)
+            if args.daemon or args.watch:
+                recorder.export_metrics(args.metrics)
+
+    settings = ConfigSettings(config_file_path(args))
+    if args.save_config:
+        return settings.save(args)
+    if args.quota:
+        for usage_name, usage_value in sorted(
+                build_rate_limiter(args, settings).usage().items()):
+            print("{0}: {1}".format(usage_name, usage_value))
+        return 0
+    profiler.mark("settings")
+
+    cache = None
+    cache_enabled = settings.cache.get("enabled", True) and not args.no_cache
+    if cache_enabled or args.cache_stats:
+        from translation.cache import TranslationCache
+
+        cache_path = config_base_path(args) + ".cache.sqlite"
+        cache = TranslationCache(cache_path,
+                                 settings.cache.get("max_entries"),
+                                 settings.cache.get("max_age"))
+        if args.cache_stats:
+            for stat_name, stat_value in sorted(cache.stats().items()):
+                print("{0}: {1}".format(stat_name, stat_value))
+            return 0
+    profiler.mark("cache open")
+
+    memory = None
+    if settings.memory.get("enabled") or args.tm or args.tm_import or \
+            args.tm_export or args.tm_suggest:
+        memory = open_memory(args, settings)
+        try:
+            if args.tm_import:
+                imported = memory.import_tmx(args.tm_import)
+                memory.save()
+                print("Imported {0} segments from: {1}".format(
+                    imported, args.tm_import))
+            if args.tm_export:
+                memory.export_tmx(args.tm_export)
+                print("Exported {0} segments to: {1}".format(
+                    len(memory), args.tm_export))
+        except (OSError, SyntaxError) as tmx_exception:
+            # ElementTree's ParseError is a SyntaxError
+            print("[Error] Could not read/write TMX file!")
+            print("[Error] -> {0}".format(tmx_exception))
+            return 1
+        if args.tm_import or args.tm_export:
+            return 0
+        atexit.register(memory.save)
+    profiler.mark("memory open")
+
+    input_type = args.input if args.input else settings.input
+    output_type = args.output if args.output else settings.output
+    source_lang = args.source_lang if args.source_lang else "auto"
+    target_lang = args.target_lang if args.target_lang else settings.language
+    backend = args.backend if args.backend else settings.backend
+    api_key = args.api_key if args.api_key else settings.api_key
+    target_langs = target_lang.split(",")
+    many_targets = len(target_langs) > 1
+    if many_targets and (args.daemon or args.watch or args.client or
+                         args.stream or args.format != "plain"):
+        print("[Error] Many target languages (-t) can not be used with "
+              "--daemon, --watch, --client, --stream or --format")
+        return 1
+
+    if args.daemon or args.client:
+        from utils.daemon import default_socket_path
+
+        socket_path = args.socket if args.socket else default_socket_path()
+
+    if args.daemon:
+        return run_daemon(build_translator(args, settings, backend, api_key,
+                                           cache, memory, args.batch_window),
+                          socket_path)
+
+    if args.watch:
+        return run_watch(build_translator(args, settings, backend, api_key,
+                                          cache, memory), input_type,
+                         output_type, source_lang, target_lang,
+                         args.exchange or settings.exchange,
+                         args.watch_interval)
+
+    source_lines = None
+    if args.stream and not is_text_input(input_type):
+        print("[Error] --stream needs a 'file:PATH' or '-' input (-i)")
+        return 1
+    elif args.format != "plain" and (args.stream or args.client):
+        print("[Error] --format can not be used with --stream or --client")
+        return 1
+    elif args.message:
+        source_text = args.message
+    elif args.stream:
+        source_text = None
+    elif is_text_input(input_type):
+        source_lines = pull_lines(input_type)
+        source_text = "\n".join(source_lines)
+    else:
+        source_text = pull_source_text(input_type)
+    profiler.mark("input")
+
+    if args.tm_suggest:
+        if source_text is None:
+            print("[Error] --tm-suggest can not be used with --stream")
+            return 1
+        for target in target_langs:
+            for source, translation, direction, similarity in \
+                    memory.suggest(source_text, source_lang, target):
+                print("{0:.2f} {1}: {2}\n     <- {3}".format(
+                    similarity, direction, translation, source))
+        return 0
+
+    cached, cache_missed = None, ()
+    if cache:
+        cache_key_backend = cache_backend(settings, backend)
+    if cache and args.format != "plain":
+        cached = cache.get(cache_key_backend, source_text, source_lang,
+                           target_lang, args.format)
+    elif cache and source_lines is None and not args.stream and \
+            not many_targets:
+        cached = cache.get(cache_key_backend, source_text, source_lang,
+                           target_lang)
+        cache_missed = [(source_text, source_lang, target_lang)]
+
+    if cached:
+        translation, direction = cached
+        profiler.mark("cache hit")
+    elif args.client:
+        from utils.daemon import request_translation
+
+        try:
+            reply = request_translation(socket_path, source_text, source_lang,
+                                        target_lang, output_type,
+                                        args.timeout)
+        except (OSError, ValueError) as daemon_exception:
+            print("[Error] Could not reach babelPy daemon at " + socket_path)
+            print("[Error] -> {0}".format(daemon_exception))
+            return 1
+        if "error" in reply:
+            print("[Error] An error occurred while requesting translation!")
+            print("[Error] -> " + reply["error"])
+            return 1
+        translation, direction = reply["translation"], reply["direction"]
+        profiler.mark("daemon request")
+    else:
+        translator = build_translator(args, settings, backend, api_key, cache,
+                                      memory, cache_missed=cache_missed)
+        profiler.mark("backend init")
+        try:
+            if args.stream:
+                from utils.stream import read_chunks, translate_stream
+
+                with open_input(input_type) as input_stream:
+                    chunks = read_chunks(input_stream,
+                                         translator.max_text_length)
+                    for translated_chunk in translate_stream(
+                            translator, chunks, source_lang, target_lang,
+                            args.max_in_flight):
+                        sys.stdout.write(translated_chunk)
+                        sys.stdout.flush()
+                profiler.mark("stream")
+                profiler.report()
+                return 0
+            elif args.format != "plain":
+                from translation.document import translate_document
+
+                translation, direction = translate_document(translator,
+                                                            source_text,
+                                                            args.format,
+                                                            source_lang,
+                                                            target_lang)
+                if cache:
+                    cache.put(cache_key_backend, source_text, source_lang,
+                              target_lang, translation, direction,
+                              args.format)
+            elif many_targets:
+                results = translator.translate_targets(source_text,
+                                                       source_lang,
+                                                       target_langs)
+                translation = format_translations(results)
+            elif source_lines is not None:
+                translation, direction = translate_lines(translator,
+                                                         source_lines,
+                                                         source_lang,
+                                                         target_lang)
+            else:
+                translation, direction = translator.translate(source_text,
+                                                              source_lang,
+                                                              target_lang)
+        except OSError as network_exception:
+            # requests' ConnectionError and socket errors are both OSErrors
+            print("[Error] An connection error occurred while accessing the "
+                  "network.")
+            print("[Error] -> {0}".format(network_exception))
+            return 1
+        except TranslateExceptionABC as translate_error:
+            print("[Error] An error occurred while requesting translation!")
+            print("[Error] -> " + translate_error.msg)
+            return 1
+        profiler.mark("translate")
+
+    if many_targets:
+        output_translations(output_type, source_text, results)
+    # In client mode the daemon already showed the notification
+    elif output_type != "notify" or not args.client or cached:
+        output_translation(output_type, source_text, translation, direction,
+                           target_lang)
+
+    if args.exchange or settings.exchange:
+        push_translation(translation)
+    profiler.mark("output")
+    profiler.report()
+    if many_targets and any("error" in result for result in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Benchmarks the translation pipeline against a local Yandex stub server
+
+    python -m benchmarks.run --latency 0.02 --texts 200 -o results.json
+
+Every mode translates the same texts; results (throughput, p50/p95/p99
+latency, API requests and peak Python memory) are emitted as JSON so they
+can be compared between releases.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.stub_server import StubYandexServer
+from translation.aio import AsyncConcurrentTranslateHelper
+from translation.cache import CachedTranslateHelper, TranslationCache
+from translation.executor import ConcurrentTranslateHelper
+from translation.instrument import percentile
+from translation.yandex import YandexHelper
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def summarize(latencies, elapsed, items, requests, peak_memory):
+    return {
+        "items": items,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(items / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "requests": requests,
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def run_single(helper, texts):
+    return [timed(helper.translate, text, "en", "de")[1] for text in texts]
+
+
+def run_batched(helper, texts):
+    return [timed(helper.translate_batch, texts, "en", "de")[1]]
+
+
+def run_concurrent(helper, texts, concurrency):
+    executor = ConcurrentTranslateHelper(helper, concurrency)
+    futures = [executor.executor.submit(timed, helper.translate, text, "en",
+                                        "de") for text in texts]
+    latencies = [future.result()[1] for future in futures]
+    executor.shutdown()
+    return latencies
+
+
+def run_async(helper, texts, concurrency):
+    async def timed_translation(bounded, text):
+        started = time.perf_counter()
+        await bounded.atranslate(text, "en", "de")
+        return time.perf_counter() - started
+
+    async def translate_all():
+        bounded = AsyncConcurrentTranslateHelper(helper, concurrency)
+        latencies = await asyncio.gather(*(timed_translation(bounded, text)
+                                           for text in texts))
+        helper.async_translate.close()
+        return latencies
+
+    return asyncio.run(translate_all())
+
+
+def measure(server, mode, texts, concurrency):
+    helper = YandexHelper("benchmark", api_url=server.api_url,
+                          pool_size=concurrency)
+    if mode == "cached":
+        helper = CachedTranslateHelper(helper, TranslationCache(":memory:"),
+                                       "yandex")
+        run_single(helper, texts)  # Warm up, the measured pass only hits
+    runners = {
+        "single": lambda: run_single(helper, texts),
+        "batched": lambda: run_batched(helper, texts),
+        "concurrent": lambda: run_concurrent(helper, texts, concurrency),
+        "cached": lambda: run_single(helper, texts),
+        "async": lambda: run_async(helper, texts, concurrency),
+    }
+    requests_before = server.requests
+    tracemalloc.start()
+    latencies, elapsed = timed(runners[mode])
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(latencies, elapsed, len(texts),
+                     server.requests - requests_before, peak_memory)
+
+
+def measure_cold_start(runs):
+    """Times full babelPy.py invocations on the offline backend"""
+    with tempfile.TemporaryDirectory() as config_dir:
+        command = [sys.executable, os.path.join(APP_PATH, "babelPy.py"),
+                   "-c", os.path.join(config_dir, "babelPy.json"),
+                   "-b", "offline", "-s", "en", "-t", "de", "-o", "stdout",
+                   "-m", "Hello world", "--no-cache"]
+        latencies = [timed(lambda: subprocess.run(
+            command, stdout=subprocess.DEVNULL, check=True))[1]
+            for _ in range(runs)]
+    return summarize(latencies, sum(latencies), runs, 0, 0)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="babelPy benchmarks")
+    arg_parser.add_argument('--latency', type=float, default=0.02,
+                            help='Stub server latency per request (seconds)')
+    arg_parser.add_argument('--texts', type=int, default=200,
+                            help='Number of texts translated per mode')
+    arg_parser.add_argument('--concurrency', type=int, default=8,
+                            help='Max concurrent requests (concurrent and '
+                                 'async modes)')
+    arg_parser.add_argument('--cold-start-runs', type=int, default=5,
+                            help='babelPy.py invocations to time')
+    arg_parser.add_argument('--modes', default='single,batched,concurrent,'
+                                               'cached,async',
+                            help='Comma separated modes to run')
+    arg_parser.add_argument('-o', '--output', metavar='FILE',
+                            help='Write JSON results to FILE (default: '
+                                 'stdout)')
+    args = arg_parser.parse_args(argv)
+
+    texts = ["Benchmark sentence number {0}.".format(index)
+             for index in range(args.texts)]
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_s": args.latency,
+            "texts": args.texts,
+            "concurrency": args.concurrency,
+        },
+        "modes": {},
+    }
+    with StubYandexServer(args.latency) as server:
+        for mode in args.modes.split(","):
+            results["modes"][mode] = measure(server, mode, texts,
+                                             args.concurrency)
+    if args.cold_start_runs:
+        results["cold_start"] = measure_cold_start(args.cold_start_runs)
+
+    report = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
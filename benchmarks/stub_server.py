@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from translation.yandex import YandexHelper, YandexTranslator
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Emulates Yandex tr.json getLangs, detect and translate endpoints"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if urlparse(self.path).path.endswith("/getLangs"):
+            self._reply({"dirs": self.server.directions})
+        else:
+            self._reply({"code": 404})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = parse_qs(self.rfile.read(length).decode("utf-8"))
+        time.sleep(self.server.latency)
+        with self.server.requests_lock:  # One handler thread per request
+            self.server.requests += 1
+        texts = data.get("text", [])
+        endpoint = urlparse(self.path).path.rsplit("/", 1)[-1]
+        if endpoint == "detect":
+            self._reply({"code": 200, "lang": "en"})
+        elif sum(len(text) for text in texts) > \
+                YandexTranslator.max_text_length:
+            self._reply({"code": 413})
+        else:
+            lang = data.get("lang", ["en"])[0]
+            direction = lang if "-" in lang else "en-" + lang
+            self._reply({"code": 200, "lang": direction,
+                         "text": ["[{0}] {1}".format(direction, text)
+                                  for text in texts]})
+
+    def log_message(self, *args):
+        pass
+
+
+class StubYandexServer(ThreadingHTTPServer):
+    """StubYandexServer - Local stand-in for the Yandex translate API"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        """Constructor for StubYandexServer - latency is seconds per call"""
+        super().__init__((host, port), _StubHandler)
+        self.latency = latency
+        self.requests = 0
+        self.requests_lock = threading.Lock()
+        self.directions = YandexHelper("stub").available_translations
+        self.thread = None
+
+    @property
+    def api_url(self):
+        """URL template to pass as YandexTranslator(api_url=...)"""
+        return "http://{0}:{1}/api/{{version}}/tr.json/{{endpoint}}".format(
+            *self.server_address)
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -20,6 +20,7 @@ class TranslateExceptionABC(BaseException, ABC):
     msg = "NO_ERROR"
 
     def __init__(self, status_code):
+        self.status_code = status_code
         self.msg = self.error_codes.get(status_code)
 
     @abstractmethod
@@ -27,10 +28,71 @@ class TranslateExceptionABC(BaseException, ABC):
         return self.msg
 
 
+class DetectionNotSupportedException(TranslateExceptionABC):
+    """
+    Raised by backends unable to detect languages (give a source language)
+    """
+    error_codes = {
+        501: "ERR_DETECTION_NOT_SUPPORTED",
+    }
+
+    def __init__(self, status_code=501):
+        self.status_code = status_code
+        self.msg = self.error_codes.get(status_code)
+
+    def __str__(self): return self.msg
+
+
 class TranslateHelperABC(ABC):
     """TranslateHelperABC: Abstract class representing translate backend"""
 
+    max_text_length = 10000  # Characters accepted in a single request
+
     @abstractmethod
     def translate(self, target_text, source_lang, target_lang):
         """Abstract method for requesting manual translation"""
         pass
+
+    def detect(self, target_text):
+        """
+        Returns language code of target_text. By default a backend can not
+        detect languages, raising DetectionNotSupportedException, which is
+        reported like other backend errors.
+        """
+        raise DetectionNotSupportedException()
+
+    def detect_batch(self, target_texts):
+        """Returns language code of each text"""
+        return [self.detect(target_text) for target_text in target_texts]
+
+    def load_catalog(self, cache_path, ttl=None):
+        """Loads the backend language catalog cached at cache_path"""
+        pass
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        """Translates many texts, returns (translation, direction) tuples"""
+        return [self.translate(target_text, source_lang, target_lang)
+                for target_text in target_texts]
+
+    async def adetect(self, target_text):
+        """Returns language code of target_text, from a coroutine"""
+        import asyncio  # Here, as it is slow to import and CLI runs skip it
+
+        # Backends without native asyncio support block a worker thread
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.detect, target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        """Coroutine counterpart of translate()"""
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.translate, target_text, source_lang, target_lang)
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        """Coroutine counterpart of translate_batch()"""
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.translate_batch, target_texts, source_lang,
+            target_lang)
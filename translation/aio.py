@@ -0,0 +1,310 @@
+import asyncio
+import base64
+import collections
+import socket
+import ssl
+import urllib.parse
+import urllib.request
+
+from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+
+
+def _authority(host, port, scheme=None):
+    """
+    Returns host:port for Host headers and CONNECT, without credentials,
+    the port left out when it is the default of scheme
+    >>> _authority("h", 443, "https"), _authority("::1", 8080)
+    ('h', '[::1]:8080')
+    """
+    if ":" in host:
+        host = "[" + host + "]"  # IPv6 literal
+    if port == {"http": 80, "https": 443}.get(scheme):
+        return host
+    return "{0}:{1}".format(host, port)
+
+
+class AsyncConnectionPool(object):
+    """AsyncConnectionPool - Keep-alive HTTP/1.1 connections on asyncio"""
+
+    def __init__(self, max_connections=10, proxies=None):
+        """
+        Constructor for AsyncConnectionPool - At most max_connections are
+        open at once (shared by all hosts), idle ones are reused. Pooled
+        connections belong to the event loop running the latest request,
+        they are dropped when a request runs on another one. proxies maps
+        a scheme to an http:// proxy URL, like requests does (Default: the
+        HTTP(S)_PROXY and NO_PROXY environment variables); https requests
+        are tunnelled through it with CONNECT.
+        """
+        self.max_connections = max_connections
+        self.proxies = proxies
+        self.idle = collections.defaultdict(collections.deque)
+        self._slots = None
+        self._loop = None
+        self._ssl_context = None
+
+    def _bind(self):
+        """Resets connections and slots made on a previous event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            # e.g. one asyncio.run() per call: the old loop may be closed
+            for connections in self.idle.values():
+                for _, writer in connections:
+                    try:
+                        writer.close()
+                    except RuntimeError:
+                        pass
+            self.idle.clear()
+        self._loop = loop
+        self._slots = None
+
+    @property
+    def slots(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._slots
+
+    def _proxy(self, scheme, host):
+        """Returns split proxy URL for scheme://host, None if direct"""
+        if self.proxies is not None:
+            proxy = self.proxies.get(scheme)
+        elif urllib.request.proxy_bypass(host):
+            return None
+        else:
+            proxy = urllib.request.getproxies().get(scheme)
+        return urllib.parse.urlsplit(proxy) if proxy else None
+
+    @staticmethod
+    def _proxy_authorization(proxy):
+        """Returns Proxy-Authorization header line of proxy ("" if none)"""
+        if not proxy.username:
+            return ""
+        credentials = "{0}:{1}".format(
+            urllib.parse.unquote(proxy.username),
+            urllib.parse.unquote(proxy.password or ""))
+        return "Proxy-Authorization: Basic {0}\r\n".format(
+            base64.b64encode(credentials.encode("utf-8")).decode("ascii"))
+
+    async def _tunnel(self, proxy, host, port):
+        """Returns a socket connected to host:port through proxy CONNECT"""
+        loop = asyncio.get_running_loop()
+        family, kind, protocol, _, address = (await loop.getaddrinfo(
+            proxy.hostname, proxy.port or 80, type=socket.SOCK_STREAM))[0]
+        tunnel = socket.socket(family, kind, protocol)
+        tunnel.setblocking(False)
+        authority = _authority(host, port)
+        try:
+            await loop.sock_connect(tunnel, address)
+            await loop.sock_sendall(tunnel, (
+                "CONNECT {0} HTTP/1.1\r\nHost: {0}\r\n{1}\r\n".format(
+                    authority, self._proxy_authorization(proxy))
+            ).encode("latin-1"))
+            response = b""
+            while b"\r\n\r\n" not in response:
+                received = await loop.sock_recv(tunnel, 4096)
+                if not received:
+                    raise ConnectionResetError("Connection closed by proxy")
+                response += received
+            status = int(response.split(None, 2)[1])
+            if status != 200:
+                raise ConnectionRefusedError(
+                    "Proxy refused a tunnel to {0} (HTTP {1})".format(
+                        authority, status))
+        except BaseException:
+            tunnel.close()
+            raise
+        return tunnel
+
+    async def _connect(self, scheme, host, port, proxy=None):
+        if proxy is not None and scheme != "https":
+            # Plain HTTP requests go to the proxy, with absolute URLs
+            return await asyncio.open_connection(proxy.hostname,
+                                                 proxy.port or 80)
+        if scheme != "https":
+            return await asyncio.open_connection(host, port)
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        if proxy is None:
+            return await asyncio.open_connection(host, port,
+                                                 ssl=self._ssl_context)
+        return await asyncio.open_connection(
+            sock=await self._tunnel(proxy, host, port),
+            ssl=self._ssl_context, server_hostname=host)
+
+    @staticmethod
+    async def _read_response(reader):
+        """Returns (status, body, keep_alive) of one HTTP/1.1 response"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if not size:
+                    while (await reader.readline()).strip():
+                        pass  # Trailer headers
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body, keep_alive = await reader.read(), False
+        return status, bytes(body), keep_alive
+
+    async def request(self, method, url, fields=None):
+        """
+        Sends an HTTP request (fields form encoded, in the query string for
+        GET), returns (status, body bytes). Cancelling it (e.g. on timeout)
+        closes the connection in use instead of returning it to the pool.
+        """
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = parts.scheme, parts.hostname, port
+        encoded = urllib.parse.urlencode(fields or {}, doseq=True)
+        host = _authority(parts.hostname, port, parts.scheme)
+        target = parts.path or "/"
+        query = "&".join(part for part in (
+            parts.query, encoded if method == "GET" else "") if part)
+        if query:
+            target += "?" + query
+        proxy = self._proxy(parts.scheme, parts.hostname)
+        proxy_header = ""
+        if proxy is not None and parts.scheme != "https":
+            target = "http://" + host + target
+            proxy_header = self._proxy_authorization(proxy)
+        body = b"" if method == "GET" else encoded.encode("ascii")
+        self._bind()
+        request_bytes = (
+            "{0} {1} HTTP/1.1\r\nHost: {2}\r\n{3}"
+            "Content-Type: application/x-www-form-urlencoded\r\n"
+            "Content-Length: {4}\r\nAccept-Encoding: identity\r\n"
+            "Connection: keep-alive\r\n\r\n".format(
+                method, target, host, proxy_header, len(body))
+        ).encode("latin-1") + body
+        async with self.slots:
+            while True:
+                reused = bool(self.idle[key])
+                if reused:
+                    reader, writer = self.idle[key].popleft()
+                else:
+                    reader, writer = await self._connect(*key, proxy=proxy)
+                try:
+                    writer.write(request_bytes)
+                    await writer.drain()
+                    status, response_body, keep_alive = \
+                        await self._read_response(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        continue  # Idle connection closed by the server
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self.idle[key].append((reader, writer))
+                else:
+                    writer.close()
+                return status, response_body
+
+    def close(self):
+        """Closes idle connections"""
+        for connections in self.idle.values():
+            while connections:
+                connections.popleft()[1].close()
+
+
+class AsyncConcurrentTranslateHelper(TranslateHelperABC):
+    """AsyncConcurrentTranslateHelper - Bounded concurrency on one loop"""
+
+    def __init__(self, helper, max_concurrency=100, timeout=None):
+        """
+        Constructor for AsyncConcurrentTranslateHelper - Wraps given helper,
+        running at most max_concurrency of its atranslate() calls at once,
+        each cancelled (raising asyncio.TimeoutError) after timeout seconds
+        >>> from translation.offline import OfflineHelper
+        >>> helper = AsyncConcurrentTranslateHelper(OfflineHelper())
+        >>> asyncio.run(helper.translate_many(["a", "b"], "en", "de"))
+        [('[en-de] a', 'en-de'), ('[en-de] b', 'en-de')]
+        """
+        self.helper = helper
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_text_length = helper.max_text_length
+        self._semaphore = None
+        self._loop = None
+
+    @property
+    def semaphore(self):
+        """Semaphore of the running event loop (a new one per loop)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or loop is not self._loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def translate(self, target_text, source_lang, target_lang):
+        return self.helper.translate(target_text, source_lang, target_lang)
+
+    async def adetect(self, target_text):
+        async with self.semaphore:
+            return await asyncio.wait_for(self.helper.adetect(target_text),
+                                          self.timeout)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        async with self.semaphore:
+            return await asyncio.wait_for(
+                self.helper.atranslate(target_text, source_lang,
+                                       target_lang), self.timeout)
+
+    async def translate_many(self, target_texts, source_lang, target_lang):
+        """Translates every text concurrently, results keep input order"""
+        return await asyncio.gather(*(
+            self.atranslate(target_text, source_lang, target_lang)
+            for target_text in target_texts))
+
+    async def as_completed(self, target_texts, source_lang, target_lang):
+        """
+        Yields (index, result) as each translation finishes, result being
+        (translation, direction) or the exception that translation raised.
+        Translations still running are cancelled if iteration stops early.
+        >>> from translation.offline import OfflineHelper
+        >>> async def translated():
+        ...     helper = AsyncConcurrentTranslateHelper(OfflineHelper())
+        ...     return sorted([result async for result in helper.as_completed(
+        ...         ["a", "b"], "en", "de")])
+        >>> asyncio.run(translated())
+        [(0, ('[en-de] a', 'en-de')), (1, ('[en-de] b', 'en-de'))]
+        """
+        async def translate_indexed(index, target_text):
+            try:
+                return index, await self.atranslate(target_text, source_lang,
+                                                    target_lang)
+            except (TranslateExceptionABC, OSError,
+                    asyncio.TimeoutError) as exception:
+                return index, exception
+
+        tasks = [asyncio.ensure_future(translate_indexed(index, target_text))
+                 for index, target_text in enumerate(target_texts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from translation.abc_translate import TranslateHelperABC
+
+
+class _PendingBatch(object):
+    """_PendingBatch - Texts queued for one direction, and their futures"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.futures = {}  # text -> Future, insertion ordered
+        self.chars = 0
+
+
+class BatchingTranslateHelper(TranslateHelperABC):
+    """BatchingTranslateHelper - Merges concurrent translate() calls"""
+
+    def __init__(self, helper, window=0.005, max_batch=50, max_chars=None,
+                 max_concurrency=4, detection_threshold=0.95):
+        """
+        Constructor for BatchingTranslateHelper - Wraps given helper,
+        queueing translate() calls per direction for up to window seconds,
+        then sending them as one translate_batch() call (sooner once
+        max_batch texts or max_chars characters, Default: the helper's
+        max_text_length, are queued). Identical texts queued or in flight
+        share one translation. At most max_concurrency batches are sent
+        at once. Texts of unknown ("auto") source language are queued by
+        the language detected offline, when its confidence reaches
+        detection_threshold, else sent on their own.
+        >>> from translation.offline import OfflineHelper
+        >>> helper = BatchingTranslateHelper(OfflineHelper())
+        >>> futures = [helper.submit(text, "en", "de")
+        ...            for text in ["a", "b", "a"]]
+        >>> [future.result()[0] for future in futures]
+        ['[en-de] a', '[en-de] b', '[en-de] a']
+        >>> helper.stats()
+        {'calls': 3, 'coalesced': 1, 'batches': 1, 'batched_texts': 2}
+        >>> helper.translate("Where is the station? Thank you very much.",
+        ...                  "auto", "de")[1]
+        'en-de'
+        >>> helper.shutdown()
+        """
+        self.helper = helper
+        self.window = window
+        self.max_batch = max_batch
+        self.max_chars = max_chars or helper.max_text_length
+        self.max_text_length = helper.max_text_length
+        self.detection_threshold = detection_threshold
+        self.detector = None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.condition = threading.Condition()
+        self.pending = {}  # (source_lang, target_lang) -> _PendingBatch
+        self.in_flight = {}  # (source_lang, target_lang, text) -> Future
+        self.timer = None
+        self.closed = False
+        self.calls = self.coalesced = self.batches = self.batched_texts = 0
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def translate(self, target_text, source_lang, target_lang):
+        return self.submit(target_text, source_lang, target_lang).result()
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        # Already a batch, nothing to gain from waiting for more texts
+        return self.helper.translate_batch(target_texts, source_lang,
+                                           target_lang)
+
+    def submit(self, target_text, source_lang, target_lang):
+        """Queues a translation, returns a concurrent.futures.Future"""
+        if source_lang == "auto":
+            # Batched texts share one source language, known beforehand
+            source_lang = self._detect(target_text, target_lang)
+        if source_lang == "auto":
+            return self.executor.submit(self.helper.translate, target_text,
+                                        source_lang, target_lang)
+        direction = source_lang, target_lang
+        with self.condition:
+            self.calls += 1
+            future = self.in_flight.get(direction + (target_text,))
+            if future is not None:
+                self.coalesced += 1
+                return future
+            batch = self.pending.get(direction)
+            if batch is not None and batch.futures and \
+                    batch.chars + len(target_text) > self.max_chars:
+                self._dispatch(direction)
+                batch = None
+            if batch is None:
+                batch = self.pending[direction] = _PendingBatch(
+                    time.monotonic() + self.window)
+                self._start_timer()
+                self.condition.notify()
+            future = Future()
+            batch.futures[target_text] = future
+            batch.chars += len(target_text)
+            self.in_flight[direction + (target_text,)] = future
+            if len(batch.futures) >= self.max_batch or \
+                    batch.chars >= self.max_chars:
+                self._dispatch(direction)
+            return future
+
+    def _detect(self, target_text, target_lang):
+        """Returns language detected offline if sure enough, else auto"""
+        if self.detector is None:
+            from translation.detect import NgramDetector
+
+            self.detector = NgramDetector()
+        language, confidence = self.detector.detect(target_text)
+        if not language or confidence < self.detection_threshold or \
+                language == target_lang:
+            return "auto"  # Left to the backend, as without batching
+        return language
+
+    def _start_timer(self):
+        if self.timer is None:
+            self.timer = threading.Thread(target=self._flush_expired,
+                                          name="babelPy-batching",
+                                          daemon=True)
+            self.timer.start()
+
+    def _flush_expired(self):
+        with self.condition:
+            while not self.closed:
+                now = time.monotonic()
+                for direction, batch in list(self.pending.items()):
+                    if batch.deadline <= now:
+                        self._dispatch(direction)
+                deadlines = [batch.deadline
+                             for batch in self.pending.values()]
+                self.condition.wait(min(deadlines) - now
+                                    if deadlines else None)
+
+    def _dispatch(self, direction):
+        """Sends the pending batch of direction (condition held)"""
+        batch = self.pending.pop(direction)
+        self.batches += 1
+        self.batched_texts += len(batch.futures)
+        self.executor.submit(self._send, direction, batch.futures)
+
+    def _send(self, direction, futures):
+        # Callers may have given up (cancelled) while the batch was queued
+        running = {target_text: future
+                   for target_text, future in futures.items()
+                   if future.set_running_or_notify_cancel()}
+        try:
+            if running:
+                results = self.helper.translate_batch(list(running),
+                                                      *direction)
+                for future, result in zip(running.values(), results):
+                    future.set_result(result)
+        except BaseException as exception:
+            for future in running.values():
+                if not future.done():
+                    future.set_exception(exception)
+        finally:
+            with self.condition:
+                for target_text in futures:
+                    self.in_flight.pop(direction + (target_text,), None)
+
+    def stats(self):
+        """Returns dict with call, coalescing and batch counts"""
+        with self.condition:
+            return {"calls": self.calls, "coalesced": self.coalesced,
+                    "batches": self.batches,
+                    "batched_texts": self.batched_texts}
+
+    def shutdown(self, wait=True):
+        """Sends the batches still queued, then stops the worker threads"""
+        with self.condition:
+            for direction in list(self.pending):
+                self._dispatch(direction)
+            self.closed = True
+            self.condition.notify()
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,217 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from translation import instrument
+from translation.abc_translate import TranslateHelperABC
+
+
+def normalize_text(text):
+    """
+    Returns the normalized form of text used for cache keys
+    >>> normalize_text("  Hello world!\\n")
+    'Hello world!'
+    """
+    return unicodedata.normalize("NFC", text).strip()
+
+
+class TranslationCache(object):
+    """TranslationCache - Persistent SQLite backed translation cache"""
+
+    default_max_entries = 10000
+    default_max_age = 30 * 24 * 60 * 60  # Seconds
+
+    def __init__(self, db_path, max_entries=None, max_age=None):
+        """
+        Constructor for TranslationCache - Opens (or creates) cache database
+        >>> cache = TranslationCache(":memory:")
+        >>> cache.get("yandex", "Hola", "es", "en") is None
+        True
+        >>> cache.put("yandex", "Hola", "es", "en", "Hello", "es-en")
+        >>> cache.get("yandex", " Hola ", "es", "en")
+        ('Hello', 'es-en')
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries or self.default_max_entries
+        self.max_age = max_age or self.default_max_age
+        self.connection = sqlite3.connect(db_path, timeout=5,
+                                          check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, backend TEXT, source_lang TEXT,"
+                " target_lang TEXT, text_format TEXT, translation TEXT,"
+                " direction TEXT, created REAL, accessed REAL)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed"
+                " ON entries (accessed)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT PRIMARY KEY, value INTEGER)")
+
+    @staticmethod
+    def key(backend, text, source_lang, target_lang, text_format="plain"):
+        """Returns cache key for given translation request"""
+        raw = "\x00".join((backend, normalize_text(text), source_lang,
+                           target_lang, text_format))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        instrument.count("babelpy_cache_" + name + "_total")
+        self.connection.execute(
+            "INSERT OR IGNORE INTO counters VALUES (?, 0)", (name,))
+        self.connection.execute(
+            "UPDATE counters SET value = value + 1 WHERE name = ?", (name,))
+
+    def get(self, backend, text, source_lang, target_lang,
+            text_format="plain"):
+        """Returns cached (translation, direction) tuple or None on miss"""
+        key = self.key(backend, text, source_lang, target_lang, text_format)
+        now = time.time()
+        with instrument.span("cache.get"), self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT translation, direction, created FROM entries"
+                " WHERE key = ?", (key,)).fetchone()
+            if row and now - row[2] > self.max_age:
+                self.connection.execute("DELETE FROM entries WHERE key = ?",
+                                        (key,))
+                row = None
+            if not row:
+                self._count("misses")
+                return None
+            self.connection.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._count("hits")
+        return row[0], row[1]
+
+    def put(self, backend, text, source_lang, target_lang, translation,
+            direction, text_format="plain"):
+        """Stores given translation, evicting least recently used entries"""
+        key = self.key(backend, text, source_lang, target_lang, text_format)
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES"
+                " (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, backend, source_lang, target_lang, text_format,
+                 translation, direction, now, now))
+            self.connection.execute("DELETE FROM entries WHERE created < ?",
+                                    (now - self.max_age,))
+            self.connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries"
+                " ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def clear(self):
+        """Removes every cached entry and resets counters"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.execute("DELETE FROM counters")
+
+    def stats(self):
+        """Returns dict with cache usage statistics"""
+        with self.lock:
+            entries = self.connection.execute(
+                "SELECT COUNT(*) FROM entries").fetchone()[0]
+            counters = dict(self.connection.execute(
+                "SELECT name, value FROM counters").fetchall())
+        return {
+            "path": self.db_path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "max_age": self.max_age,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+class CachedTranslateHelper(TranslateHelperABC):
+    """CachedTranslateHelper - Serves repeated translations from cache"""
+
+    def __init__(self, helper, cache, backend, missed=()):
+        """
+        Constructor for CachedTranslateHelper - Wraps given helper, missed
+        lists (text, source_lang, target_lang) requests already looked up
+        in vain, which are not looked up again the first time
+        """
+        self.helper = helper
+        self.cache = cache
+        self.backend = backend
+        self.missed = set(missed)
+        self.max_text_length = helper.max_text_length
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def _lookup(self, target_text, source_lang, target_lang):
+        request = target_text, source_lang, target_lang
+        if request in self.missed:
+            self.missed.discard(request)
+            return None
+        return self.cache.get(self.backend, target_text, source_lang,
+                              target_lang)
+
+    def translate(self, target_text, source_lang, target_lang):
+        cached = self._lookup(target_text, source_lang, target_lang)
+        if cached:
+            return cached
+        translation, direction = self.helper.translate(target_text,
+                                                       source_lang,
+                                                       target_lang)
+        self.cache.put(self.backend, target_text, source_lang, target_lang,
+                       translation, direction)
+        return translation, direction
+
+    def _store(self, target_texts, source_lang, target_lang, results,
+               missing, translated):
+        """Caches translations of the missing texts, filling results"""
+        for index, (translation, direction) in zip(missing, translated):
+            self.cache.put(self.backend, target_texts[index], source_lang,
+                           target_lang, translation, direction)
+            results[index] = translation, direction
+        return results
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        results = [self.cache.get(self.backend, target_text, source_lang,
+                                  target_lang) for target_text in target_texts]
+        missing = [index for index, result in enumerate(results) if not result]
+        if not missing:
+            return results
+        translated = self.helper.translate_batch(
+            [target_texts[index] for index in missing], source_lang,
+            target_lang)
+        return self._store(target_texts, source_lang, target_lang, results,
+                           missing, translated)
+
+    # Cache lookups are local and short, so they run on the event loop
+
+    async def adetect(self, target_text):
+        return await self.helper.adetect(target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        cached = self._lookup(target_text, source_lang, target_lang)
+        if cached:
+            return cached
+        translation, direction = await self.helper.atranslate(
+            target_text, source_lang, target_lang)
+        self.cache.put(self.backend, target_text, source_lang, target_lang,
+                       translation, direction)
+        return translation, direction
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        results = [self.cache.get(self.backend, target_text, source_lang,
+                                  target_lang) for target_text in target_texts]
+        missing = [index for index, result in enumerate(results) if not result]
+        if not missing:
+            return results
+        translated = await self.helper.atranslate_batch(
+            [target_texts[index] for index in missing], source_lang,
+            target_lang)
+        return self._store(target_texts, source_lang, target_lang, results,
+                           missing, translated)
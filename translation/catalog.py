@@ -0,0 +1,84 @@
+import json
+import os
+import time
+
+from translation.abc_translate import TranslateExceptionABC
+
+
+class LanguageCatalog(object):
+    """LanguageCatalog - Indexed set of supported translate directions"""
+
+    default_ttl = 7 * 24 * 60 * 60  # Seconds
+    default_hubs = ("en", "ru")
+
+    def __init__(self, directions):
+        """
+        Constructor for LanguageCatalog - Indexes 'xx-yy' direction strings
+        >>> catalog = LanguageCatalog(["az-ru", "ru-en", "en-de"])
+        >>> catalog.supports("az", "ru"), catalog.supports("az", "en")
+        (True, False)
+        >>> catalog.pivot("az", "en")
+        'ru'
+        >>> sorted(catalog.languages)
+        ['az', 'de', 'en', 'ru']
+        """
+        self.directions = frozenset(directions)
+        self.targets_by_source = {}
+        self.sources_by_target = {}
+        for direction in self.directions:
+            source_lang, target_lang = direction.split("-", 1)
+            self.targets_by_source.setdefault(source_lang,
+                                              set()).add(target_lang)
+            self.sources_by_target.setdefault(target_lang,
+                                              set()).add(source_lang)
+        self.languages = set(self.targets_by_source) | set(
+            self.sources_by_target)
+
+    def supports(self, source_lang, target_lang):
+        """Returns True if source_lang-target_lang can be translated"""
+        return target_lang in self.targets_by_source.get(source_lang, ())
+
+    def supports_target(self, target_lang):
+        """Returns True if any language can be translated to target_lang"""
+        return target_lang in self.sources_by_target
+
+    def pivot(self, source_lang, target_lang, hubs=None):
+        """Returns a hub language bridging both languages, None if none"""
+        targets = self.targets_by_source.get(source_lang, set())
+        sources = self.sources_by_target.get(target_lang, set())
+        bridges = targets & sources
+        for hub in hubs or self.default_hubs:
+            if hub in bridges:
+                return hub
+        return min(bridges) if bridges else None
+
+    @classmethod
+    def load(cls, cache_path, fetch_directions, ttl=None, fallback=()):
+        """
+        Returns catalog stored at cache_path, refreshing it with
+        fetch_directions() once it is older than ttl seconds. Stale (or
+        fallback) directions are used when the refresh fails.
+        """
+        ttl = ttl or cls.default_ttl
+        stored = {}
+        try:
+            with open(cache_path) as cache_file:
+                stored = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+        if stored.get("dirs") and time.time() - stored.get("fetched",
+                                                           0) < ttl:
+            return cls(stored["dirs"])
+        try:
+            directions = fetch_directions()
+        except (TranslateExceptionABC, OSError, ValueError):
+            return cls(stored.get("dirs") or fallback)
+        temp_path = cache_path + ".tmp"
+        try:
+            with open(temp_path, "w") as cache_file:
+                json.dump({"fetched": time.time(), "dirs": directions},
+                          cache_file)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+        return cls(directions)
@@ -0,0 +1,166 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+_non_letters = re.compile(r"[\W\d_]+")
+
+
+def ngrams(text, max_order=3):
+    """
+    Returns Counter of character n-grams (1 to max_order) of text words
+    >>> sorted(ngrams("Hi", 2).items())
+    [(' h', 1), ('h', 1), ('hi', 1), ('i', 1), ('i ', 1)]
+    """
+    counts = Counter()
+    for word in _non_letters.split(text.lower()):
+        if not word:
+            continue
+        padded = " " + word + " "
+        for order in range(1, max_order + 1):
+            for start in range(len(padded) - order + 1):
+                gram = padded[start:start + order]
+                if gram.strip():
+                    counts[gram] += 1
+    return counts
+
+
+class NgramDetector(object):
+    """NgramDetector - Offline language identifier using n-gram profiles"""
+
+    smoothing = 0.1  # Additive smoothing for n-grams missing in a profile
+    # Logistic (slope, intercept) mapping the length normalized score gap
+    # of the two best languages to a confidence, fitted by calibrate() on
+    # detect_samples.HELD_OUT
+    calibration = (2.2374, -1.3337)
+
+    def __init__(self, samples=None, max_order=3, languages=None):
+        """
+        Constructor for NgramDetector - Builds profiles from sample texts
+        >>> detector = NgramDetector()
+        >>> detector.detect("Where is the station? Thank you very much.")[0]
+        'en'
+        >>> detector.detect("1234")
+        (None, 0.0)
+        >>> for text in ["Привет, как дела?", "Сегодня хорошая погода",
+        ...              "Я люблю программирование и хорошую музыку",
+        ...              "Здравей, какво правиш днес?",
+        ...              "Добрий день, як справи?"]:
+        ...     print(detector.detect(text)[0])
+        ru
+        ru
+        ru
+        bg
+        uk
+        """
+        if samples is None:
+            from translation.detect_samples import SAMPLES as samples
+        self.max_order = max_order
+        self.languages = sorted(lang for lang in samples
+                                if not languages or lang in languages)
+        profiles = [ngrams(samples[lang], max_order)
+                    for lang in self.languages]
+        vocabulary_size = len(set().union(*profiles))
+        # Log probability given to n-grams unseen in each language profile
+        self.floors = []
+        # Inverted index: n-gram -> [(language index, log prob - floor), ...]
+        self.index = {}
+        for lang_index, profile in enumerate(profiles):
+            total = sum(profile.values()) + self.smoothing * vocabulary_size
+            floor = math.log(self.smoothing / total)
+            self.floors.append(floor)
+            for gram, count in profile.items():
+                gain = math.log((count + self.smoothing) / total) - floor
+                self.index.setdefault(gram, []).append((lang_index, gain))
+
+    def scores(self, text):
+        """Returns list with log likelihood of text for each language"""
+        counts = ngrams(text, self.max_order)
+        total = sum(counts.values())
+        scores = [floor * total for floor in self.floors]
+        for gram, count in counts.items():
+            for lang_index, gain in self.index.get(gram, ()):
+                scores[lang_index] += count * gain
+        return scores, total
+
+    def scores_each(self, texts):
+        """Returns scores() result of each text, scored one at a time"""
+        return [self.scores(text) for text in texts]
+
+    @staticmethod
+    def _gap(scores, total):
+        """Score gap of the two best languages, per sqrt of n-gram count"""
+        if len(scores) < 2:
+            return float("inf")
+        best, second = heapq.nlargest(2, scores)
+        return (best - second) / math.sqrt(total)
+
+    def confidence(self, gap):
+        """Returns calibrated probability (0..1) that the best is right"""
+        slope, intercept = self.calibration
+        exponent = -(slope * gap + intercept)
+        return 0.0 if exponent > 700 else 1.0 / (1.0 + math.exp(exponent))
+
+    def _best(self, scores, total):
+        if not total:
+            return None, 0.0
+        best = max(scores)
+        return self.languages[scores.index(best)], \
+            self.confidence(self._gap(scores, total))
+
+    def detect(self, text):
+        """
+        Returns (language, confidence) for text, confidence (0..1) being the
+        calibrated probability the language is right (few words of close
+        languages, e.g. ru/bg/uk, stay below the remote fallback threshold)
+        >>> detector = NgramDetector()
+        >>> detector.detect("Какой красивый вид!")[1] < 0.95
+        True
+        """
+        return self._best(*self.scores(text))
+
+    def calibrate(self, held_out, iterations=25):
+        """
+        Fits (and sets) calibration on held_out {language: [texts]}, each
+        text and each pair of consecutive ones being an example, by
+        logistic regression of being right on the score gap
+        >>> from translation.detect_samples import HELD_OUT
+        >>> NgramDetector().calibrate(HELD_OUT) == NgramDetector.calibration
+        True
+        """
+        examples = []
+        for lang, texts in held_out.items():
+            if lang not in self.languages:
+                continue
+            for text in texts + [first + " " + second for first, second
+                                 in zip(texts, texts[1:])]:
+                scores, total = self.scores(text)
+                if total:
+                    best_lang = self.languages[scores.index(max(scores))]
+                    right = best_lang == lang
+                    examples.append((self._gap(scores, total), right))
+        slope, intercept, ridge = 1.0, 0.0, 1e-3
+        for _ in range(iterations):  # Newton's method on the log loss
+            grad_slope, grad_intercept = ridge * slope, 0.0
+            hess_slope, hess_cross, hess_intercept = ridge, 0.0, ridge
+            for gap, right in examples:
+                z = max(min(slope * gap + intercept, 50.0), -50.0)
+                predicted = 1.0 / (1.0 + math.exp(-z))
+                residual = predicted - right
+                weight = predicted * (1.0 - predicted)
+                grad_slope += residual * gap
+                grad_intercept += residual
+                hess_slope += weight * gap * gap
+                hess_cross += weight * gap
+                hess_intercept += weight
+            determinant = hess_slope * hess_intercept - hess_cross ** 2
+            slope -= (hess_intercept * grad_slope -
+                      hess_cross * grad_intercept) / determinant
+            intercept -= (hess_slope * grad_intercept -
+                          hess_cross * grad_slope) / determinant
+        self.calibration = round(slope, 4), round(intercept, 4)
+        return self.calibration
+
+    def detect_batch(self, texts):
+        """Returns a (language, confidence) tuple for each text"""
+        return [self._best(*row) for row in self.scores_each(texts)]
@@ -0,0 +1,324 @@
+# Training samples for translation.detect.NgramDetector profiles: article 1
+# of the Universal Declaration of Human Rights plus a few everyday phrases.
+
+SAMPLES = {
+    "az": "Bütün insanlar ləyaqət və hüquqlarına görə azad və bərabər "
+          "doğulurlar. Onların şüurları və vicdanları var və bir-birlərinə "
+          "münasibətdə qardaşlıq ruhunda davranmalıdırlar. Sabahınız xeyir, "
+          "çox sağ olun. Stansiya haradadır? Nə dediyinizi başa düşmürəm. "
+          "Bu mənim evimdir, o isə sənin maşınındır.",
+    "be": "Усе людзі нараджаюцца свабоднымі і роўнымі ў сваёй годнасці і "
+          "правах. Яны надзелены розумам і сумленнем і павінны ставіцца "
+          "адзін да аднаго ў духу брацтва. Добрай раніцы, вялікі дзякуй. "
+          "Дзе знаходзіцца вакзал? Я не разумею, што вы кажаце. Гэта мой "
+          "дом, а гэта твая машына.",
+    "bg": "Всички хора се раждат свободни и равни по достойнство и права. "
+          "Те са надарени с разум и съвест и следва да се отнасят помежду "
+          "си в дух на братство. Добро утро, благодаря ви много. Къде е "
+          "гарата? Не разбирам какво казвате. Това е моята къща, а това е "
+          "твоята кола.",
+    "ca": "Tots els éssers humans neixen lliures i iguals en dignitat i en "
+          "drets. Són dotats de raó i de consciència, i han de comportar-se "
+          "fraternalment els uns amb els altres. Bon dia, moltes gràcies. On "
+          "és l'estació? No entenc el que diu. Aquesta és la meva casa i "
+          "aquell és el teu cotxe.",
+    "cs": "Všichni lidé rodí se svobodní a sobě rovní co do důstojnosti a "
+          "práv. Jsou nadáni rozumem a svědomím a mají spolu jednat v duchu "
+          "bratrství. Dobré ráno, děkuji mnohokrát. Kde je nádraží? "
+          "Nerozumím, co říkáte. Tohle je můj dům a tamto je tvoje auto.",
+    "da": "Alle mennesker er født frie og lige i værdighed og rettigheder. "
+          "De er udstyret med fornuft og samvittighed, og de bør handle mod "
+          "hverandre i en broderskabets ånd. Godmorgen, mange tak. Hvor er "
+          "banegården? Jeg forstår ikke, hvad du siger. Det er mit hus, og "
+          "det er din bil.",
+    "de": "Alle Menschen sind frei und gleich an Würde und Rechten geboren. "
+          "Sie sind mit Vernunft und Gewissen begabt und sollen einander im "
+          "Geist der Brüderlichkeit begegnen. Guten Morgen, vielen Dank. Wo "
+          "ist der Bahnhof? Ich verstehe nicht, was Sie sagen. Das ist mein "
+          "Haus und das ist dein Auto.",
+    "el": "Όλοι οι άνθρωποι γεννιούνται ελεύθεροι και ίσοι στην αξιοπρέπεια "
+          "και τα δικαιώματα. Είναι προικισμένοι με λογική και συνείδηση, "
+          "και οφείλουν να συμπεριφέρονται μεταξύ τους με πνεύμα "
+          "αδελφοσύνης. Καλημέρα, ευχαριστώ πολύ. Πού είναι ο σταθμός; Δεν "
+          "καταλαβαίνω τι λέτε. Αυτό είναι το σπίτι μου και αυτό είναι το "
+          "αυτοκίνητό σου.",
+    "en": "All human beings are born free and equal in dignity and rights. "
+          "They are endowed with reason and conscience and should act "
+          "towards one another in a spirit of brotherhood. Good morning, "
+          "thank you very much. Where is the station? I do not understand "
+          "what you are saying. This is my house and that is your car.",
+    "es": "Todos los seres humanos nacen libres e iguales en dignidad y "
+          "derechos y, dotados como están de razón y conciencia, deben "
+          "comportarse fraternalmente los unos con los otros. Buenos días, "
+          "muchas gracias. ¿Dónde está la estación? No entiendo lo que "
+          "usted dice. Esta es mi casa y ese es tu coche.",
+    "et": "Kõik inimesed sünnivad vabadena ja võrdsetena oma väärikuselt ja "
+          "õigustelt. Neile on antud mõistus ja südametunnistus ja nende "
+          "suhtumist üksteisesse peab kandma vendluse vaim. Tere hommikust, "
+          "suur aitäh. Kus on jaam? Ma ei saa aru, mida te ütlete. See on "
+          "minu maja ja see on sinu auto.",
+    "fi": "Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja "
+          "oikeuksiltaan. Heille on annettu järki ja omatunto, ja heidän on "
+          "toimittava toisiaan kohtaan veljeyden hengessä. Hyvää huomenta, "
+          "kiitos paljon. Missä on asema? En ymmärrä mitä sanot. Tämä on "
+          "minun taloni ja tuo on sinun autosi.",
+    "fr": "Tous les êtres humains naissent libres et égaux en dignité et en "
+          "droits. Ils sont doués de raison et de conscience et doivent agir "
+          "les uns envers les autres dans un esprit de fraternité. Bonjour, "
+          "merci beaucoup. Où est la gare? Je ne comprends pas ce que vous "
+          "dites. C'est ma maison et c'est ta voiture.",
+    "hr": "Sva ljudska bića rađaju se slobodna i jednaka u dostojanstvu i "
+          "pravima. Ona su obdarena razumom i sviješću pa bi jedna prema "
+          "drugima trebala postupati u duhu bratstva. Dobro jutro, puno "
+          "hvala. Gdje je kolodvor? Ne razumijem što govorite. Ovo je moja "
+          "kuća, a to je tvoj auto.",
+    "hu": "Minden emberi lény szabadon születik és egyenlő méltósága és "
+          "joga van. Az emberek, ésszel és lelkiismerettel bírván, "
+          "egymással szemben testvéri szellemben kell hogy viseltessenek. "
+          "Jó reggelt, nagyon köszönöm. Hol van az állomás? Nem értem, amit "
+          "mond. Ez az én házam, és az a te autód.",
+    "hy": "Բոլոր մարդիկ ծնվում են ազատ ու հավասար իրենց արժանապատվությամբ "
+          "ու իրավունքներով։ Նրանք ունեն բանականություն ու խիղճ և միմյանց "
+          "պետք է եղբայրաբար վերաբերվեն։ Բարի լույս, շատ շնորհակալություն։ "
+          "Որտեղ է կայարանը։ Ես չեմ հասկանում, թե ինչ եք ասում։ Սա իմ տունն "
+          "է, իսկ դա քո մեքենան է։",
+    "it": "Tutti gli esseri umani nascono liberi ed eguali in dignità e "
+          "diritti. Essi sono dotati di ragione e di coscienza e devono "
+          "agire gli uni verso gli altri in spirito di fratellanza. "
+          "Buongiorno, grazie mille. Dov'è la stazione? Non capisco quello "
+          "che dice. Questa è la mia casa e quella è la tua macchina.",
+    "lt": "Visi žmonės gimsta laisvi ir lygūs savo orumu ir teisėmis. Jiems "
+          "suteiktas protas ir sąžinė ir jie turi elgtis vienas kito "
+          "atžvilgiu kaip broliai. Labas rytas, labai ačiū. Kur yra stotis? "
+          "Aš nesuprantu, ką jūs sakote. Tai mano namas, o tai tavo "
+          "automobilis.",
+    "lv": "Visi cilvēki piedzimst brīvi un vienlīdzīgi savā pašcieņā un "
+          "tiesībās. Viņi ir apveltīti ar saprātu un sirdsapziņu, un viņiem "
+          "jāizturas citam pret citu brālības garā. Labrīt, liels paldies. "
+          "Kur ir stacija? Es nesaprotu, ko jūs sakāt. Šī ir mana māja, un "
+          "tā ir tava mašīna.",
+    "mk": "Сите човечки суштества се раѓаат слободни и еднакви по "
+          "достоинство и права. Тие се обдарени со разум и совест и треба "
+          "да се однесуваат едни кон други во духот на братството. Добро "
+          "утро, ви благодарам многу. Каде е станицата? Не разбирам што "
+          "зборувате. Ова е мојата куќа, а тоа е твојот автомобил.",
+    "nl": "Alle mensen worden vrij en gelijk in waardigheid en rechten "
+          "geboren. Zij zijn begiftigd met verstand en geweten, en behoren "
+          "zich jegens elkander in een geest van broederschap te gedragen. "
+          "Goedemorgen, heel erg bedankt. Waar is het station? Ik begrijp "
+          "niet wat u zegt. Dit is mijn huis en dat is jouw auto.",
+    "no": "Alle mennesker er født frie og med samme menneskeverd og "
+          "menneskerettigheter. De er utstyrt med fornuft og samvittighet "
+          "og bør handle mot hverandre i brorskapets ånd. God morgen, tusen "
+          "takk. Hvor er stasjonen? Jeg forstår ikke hva du sier. Dette er "
+          "huset mitt, og det er bilen din.",
+    "pl": "Wszyscy ludzie rodzą się wolni i równi pod względem swej "
+          "godności i swych praw. Są oni obdarzeni rozumem i sumieniem i "
+          "powinni postępować wobec innych w duchu braterstwa. Dzień dobry, "
+          "bardzo dziękuję. Gdzie jest dworzec? Nie rozumiem, co pan mówi. "
+          "To jest mój dom, a to jest twój samochód.",
+    "pt": "Todos os seres humanos nascem livres e iguais em dignidade e em "
+          "direitos. Dotados de razão e de consciência, devem agir uns para "
+          "com os outros em espírito de fraternidade. Bom dia, muito "
+          "obrigado. Onde fica a estação? Eu não entendo o que você está "
+          "dizendo. Esta é a minha casa e aquele é o seu carro.",
+    "ro": "Toate ființele umane se nasc libere și egale în demnitate și în "
+          "drepturi. Ele sunt înzestrate cu rațiune și conștiință și trebuie "
+          "să se comporte unele față de altele în spiritul fraternității. "
+          "Bună dimineața, mulțumesc foarte mult. Unde este gara? Nu înțeleg "
+          "ce spuneți. Aceasta este casa mea și aceea este mașina ta.",
+    "ru": "Все люди рождаются свободными и равными в своем достоинстве и "
+          "правах. Они наделены разумом и совестью и должны поступать в "
+          "отношении друг друга в духе братства. Доброе утро, большое "
+          "спасибо. Где находится вокзал? Я не понимаю, что вы говорите. Это "
+          "мой дом, а это твоя машина. Мы были бы рады видеть вас.",
+    "sk": "Všetci ľudia sa rodia slobodní a sú si rovní v dôstojnosti i "
+          "právach. Sú obdarení rozumom a svedomím a majú medzi sebou konať "
+          "v duchu bratstva. Dobré ráno, ďakujem veľmi pekne. Kde je "
+          "stanica? Nerozumiem, čo hovoríte. Toto je môj dom a tamto je "
+          "tvoje auto.",
+    "sl": "Vsi ljudje se rodijo svobodni in imajo enako dostojanstvo in "
+          "enake pravice. Obdarjeni so z razumom in vestjo in bi morali "
+          "ravnati drug z drugim kakor bratje. Dobro jutro, najlepša hvala. "
+          "Kje je postaja? Ne razumem, kaj pravite. To je moja hiša in to je "
+          "tvoj avto.",
+    "sq": "Të gjithë njerëzit lindin të lirë dhe të barabartë në dinjitet "
+          "dhe në të drejta. Ata kanë arsye e ndërgjegje dhe duhet të sillen "
+          "ndaj njëri-tjetrit me frymë vëllazërimi. Mirëmëngjes, "
+          "faleminderit shumë. Ku është stacioni? Nuk e kuptoj çfarë thoni. "
+          "Kjo është shtëpia ime dhe ajo është makina jote.",
+    "sr": "Сва људска бића рађају се слободна и једнака у достојанству и "
+          "правима. Она су обдарена разумом и свешћу и треба једни према "
+          "другима да поступају у духу братства. Добро јутро, хвала вам "
+          "пуно. Где је станица? Не разумем шта говорите. Ово је моја кућа, "
+          "а то је твој ауто.",
+    "sv": "Alla människor är födda fria och lika i värde och rättigheter. De "
+          "har utrustats med förnuft och samvete och bör handla gentemot "
+          "varandra i en anda av broderskap. God morgon, tack så mycket. Var "
+          "ligger stationen? Jag förstår inte vad du säger. Det här är mitt "
+          "hus och det där är din bil.",
+    "tr": "Bütün insanlar hür, haysiyet ve haklar bakımından eşit "
+          "doğarlar. Akıl ve vicdana sahiptirler ve birbirlerine karşı "
+          "kardeşlik zihniyeti ile hareket etmelidirler. Günaydın, çok "
+          "teşekkür ederim. İstasyon nerede? Ne dediğinizi anlamıyorum. Bu "
+          "benim evim ve şu senin araban.",
+    "uk": "Всі люди народжуються вільними і рівними у своїй гідності та "
+          "правах. Вони наділені розумом і совістю і повинні діяти у "
+          "відношенні один до одного в дусі братерства. Доброго ранку, щиро "
+          "дякую. Де знаходиться вокзал? Я не розумію, що ви кажете. Це мій "
+          "будинок, а це твоя машина. Ми будемо раді вас бачити.",
+}
+
+# Cyrillic languages share most letters and short words, so their profiles
+# get more everyday text: the UDHR article alone leaves ru, bg and uk
+# telling each other apart from a few hundred characters.
+EVERYDAY = {
+    "be": "Прывітанне! Як у цябе справы? Сёння добрае надвор'е, і мы "
+          "пойдзем гуляць у парк. Я люблю чытаць кнігі і слухаць музыку. "
+          "Што ты робіш увечары? Гэта вельмі цікава, але ў мяне няма часу. "
+          "Мне трэба купіць хлеб, малако і сыр у краме. Дзе найбліжэйшы "
+          "прыпынак аўтобуса? Прабачце, вы не падкажаце, колькі цяпер "
+          "часу? Мы жывём у вялікім горадзе ўжо тры гады. Калі будзе час, "
+          "патэлефануй мне заўтра раніцай. Яна працуе праграмістам у "
+          "невялікай кампаніі. Учора было холадна, а сёння цёпла і "
+          "сонечна. Дзякуй за дапамогу, усяго найлепшага! Дзіця ўжо спіць, "
+          "таму размаўляй цішэй. Ён заўсёды спазняецца, бо позна ўстае.",
+    "bg": "Здравей! Как си? Днес времето е хубаво и ще отидем да се "
+          "разходим в парка. Обичам да чета книги и да слушам музика. "
+          "Какво правиш довечера? Това е много интересно, но нямам време. "
+          "Трябва да купя хляб, мляко и сирене от магазина. Къде е "
+          "най-близката автобусна спирка? Извинете, бихте ли ми казали "
+          "колко е часът? Живеем в голям град вече три години. Ако имаш "
+          "време, обади ми се утре сутринта. Тя работи като програмист в "
+          "малка фирма. Вчера беше студено, а днес е топло и слънчево. "
+          "Благодаря за помощта, всичко хубаво! Хайде да се видим след "
+          "работа и да поговорим за това. Детето вече спи, затова говори "
+          "по-тихо. Той винаги закъснява, защото става късно. Моят "
+          "приятел живее във Варна, а аз съм в София.",
+    "mk": "Здраво! Како си? Денес времето е убаво и ќе одиме на прошетка "
+          "во паркот. Сакам да читам книги и да слушам музика. Што правиш "
+          "вечерва? Тоа е многу интересно, но немам време. Треба да купам "
+          "леб, млеко и сирење од продавницата. Каде е најблиската "
+          "автобуска станица? Извинете, дали може да ми кажете колку е "
+          "часот? Живееме во голем град веќе три години. Ако имаш време, "
+          "јави ми се утре наутро. Таа работи како програмер во мала "
+          "фирма. Вчера беше студено, а денес е топло и сончево. Ви "
+          "благодарам за помошта, сè најдобро! Детето веќе спие, затоа "
+          "зборувај потивко. Тој секогаш доцни, бидејќи станува доцна.",
+    "ru": "Привет, рад тебя видеть! Как у тебя дела на работе? На улице "
+          "тепло, погода сегодня хорошая, и мы пойдём гулять в парк. Я "
+          "очень люблю читать книги и слушать музыку. Что ты делаешь "
+          "вечером? Это очень интересно, но у меня нет времени. Мне нужно "
+          "купить хлеб, молоко и сыр в магазине. Где ближайшая остановка "
+          "автобуса? Извините, вы не подскажете, который час? Мы живём в "
+          "большом городе уже три года. Если будет время, позвони мне "
+          "завтра утром. Она работает программистом в небольшой компании. "
+          "Вчера было холодно, а сегодня тепло и солнечно. Спасибо за "
+          "помощь, всего хорошего! Давайте встретимся после работы и "
+          "поговорим об этом. Ребёнок уже спит, поэтому говори тише. Он "
+          "всегда опаздывает, потому что поздно встаёт. Съешь ещё этих "
+          "мягких французских булок да выпей же чаю.",
+    "sr": "Здраво! Како си? Данас је лепо време и идемо у шетњу у парк. "
+          "Волим да читам књиге и да слушам музику. Шта радиш вечерас? То "
+          "је веома занимљиво, али немам времена. Треба да купим хлеб, "
+          "млеко и сир у продавници. Где је најближа аутобуска станица? "
+          "Извините, да ли можете да ми кажете колико је сати? Живимо у "
+          "великом граду већ три године. Ако будеш имао времена, позови ме "
+          "сутра ујутру. Она ради као програмер у малој фирми. Јуче је "
+          "било хладно, а данас је топло и сунчано. Хвала на помоћи, све "
+          "најбоље! Дете већ спава, зато причај тише. Он увек касни, јер "
+          "касно устаје.",
+    "uk": "Привіт! Як у тебе справи? Сьогодні гарна погода, і ми підемо "
+          "гуляти в парк. Я люблю читати книжки і слухати музику. Що ти "
+          "робиш увечері? Це дуже цікаво, але в мене немає часу. Мені "
+          "треба купити хліб, молоко і сир у магазині. Де найближча "
+          "автобусна зупинка? Вибачте, ви не підкажете, котра година? Ми "
+          "живемо у великому місті вже три роки. Якщо буде час, "
+          "зателефонуй мені завтра вранці. Вона працює програмісткою в "
+          "невеликій компанії. Учора було холодно, а сьогодні тепло і "
+          "сонячно. Дякую за допомогу, всього найкращого! Давайте "
+          "зустрінемося після роботи й поговоримо про це. Дитина вже "
+          "спить, тому говори тихіше. Він завжди запізнюється, бо пізно "
+          "встає. Їжак їсть яблуко, а ґудзик лежить на столі.",
+}
+
+for _lang, _text in EVERYDAY.items():
+    SAMPLES[_lang] += " " + _text
+
+# Short phrases kept out of the profiles, used to calibrate detection
+# confidence (see NgramDetector.calibrate): the languages most easily
+# confused with each other, in the few words typical of a selection.
+HELD_OUT = {
+    "be": ["Дзе тут туалет?", "Я не ведаю, што сказаць.",
+           "Ён купіў новую машыну.", "Калі ласка, зачыніце дзверы.",
+           "Мы спазніліся на цягнік.", "У нас сёння госці.",
+           "Які прыгожы краявід!", "Яна размаўляе па-беларуску.",
+           "Гэта мой старэйшы брат.", "Колькі гэта каштуе?"],
+    "bg": ["Къде е тоалетната?", "Не знам какво да кажа.",
+           "Той си купи нова кола.", "Моля, затворете вратата.",
+           "Изпуснахме влака.", "Днес имаме гости.",
+           "Колко красива гледка!", "Тя говори български.",
+           "Това е по-големият ми брат.", "Колко струва това?"],
+    "mk": ["Каде е тоалетот?", "Не знам што да кажам.",
+           "Тој купи нов автомобил.", "Ве молам, затворете ја вратата.",
+           "Го изгубивме возот.", "Денес имаме гости.",
+           "Колку убав поглед!", "Таа зборува македонски.",
+           "Ова е мојот постар брат.", "Колку чини ова?"],
+    "ru": ["Где здесь туалет?", "Я не знаю, что сказать.",
+           "Он купил новую машину.", "Пожалуйста, закройте дверь.",
+           "Мы опоздали на поезд.", "У нас сегодня гости.",
+           "Какой красивый вид!", "Она говорит по-русски.",
+           "Это мой старший брат.", "Сколько это стоит?"],
+    "sr": ["Где је тоалет?", "Не знам шта да кажем.",
+           "Купио је нови ауто.", "Молим вас, затворите врата.",
+           "Закаснили смо на воз.", "Данас имамо госте.",
+           "Какав леп поглед!", "Она говори српски.",
+           "Ово је мој старији брат.", "Колико ово кошта?"],
+    "uk": ["Де тут туалет?", "Я не знаю, що сказати.",
+           "Він купив нову машину.", "Будь ласка, зачиніть двері.",
+           "Ми спізнилися на потяг.", "У нас сьогодні гості.",
+           "Який гарний краєвид!", "Вона розмовляє українською.",
+           "Це мій старший брат.", "Скільки це коштує?"],
+    "ca": ["On és el lavabo?", "No sé què dir.", "Ha comprat un cotxe nou.",
+           "Si us plau, tanqui la porta.", "Avui tenim convidats."],
+    "cs": ["Kde je toaleta?", "Nevím, co říct.", "Koupil si nové auto.",
+           "Prosím, zavřete dveře.", "Dnes máme hosty."],
+    "da": ["Hvor er toilettet?", "Jeg ved ikke, hvad jeg skal sige.",
+           "Han købte en ny bil.", "Luk venligst døren.",
+           "I dag har vi gæster."],
+    "de": ["Wo ist die Toilette?", "Ich weiß nicht, was ich sagen soll.",
+           "Er hat ein neues Auto gekauft.", "Bitte schließen Sie die Tür.",
+           "Heute haben wir Gäste."],
+    "en": ["Where is the toilet?", "I don't know what to say.",
+           "He bought a new car.", "Please close the door.",
+           "We have guests today."],
+    "es": ["¿Dónde está el baño?", "No sé qué decir.",
+           "Compró un coche nuevo.", "Por favor, cierre la puerta.",
+           "Hoy tenemos invitados."],
+    "fr": ["Où sont les toilettes ?", "Je ne sais pas quoi dire.",
+           "Il a acheté une nouvelle voiture.",
+           "Fermez la porte, s'il vous plaît.",
+           "Aujourd'hui nous avons des invités."],
+    "hr": ["Gdje je zahod?", "Ne znam što reći.", "Kupio je novi auto.",
+           "Molim vas, zatvorite vrata.", "Danas imamo goste."],
+    "it": ["Dov'è il bagno?", "Non so cosa dire.",
+           "Ha comprato una macchina nuova.", "Per favore, chiuda la porta.",
+           "Oggi abbiamo ospiti."],
+    "nl": ["Waar is het toilet?", "Ik weet niet wat ik moet zeggen.",
+           "Hij heeft een nieuwe auto gekocht.",
+           "Doe alstublieft de deur dicht.", "Vandaag hebben we gasten."],
+    "no": ["Hvor er toalettet?", "Jeg vet ikke hva jeg skal si.",
+           "Han kjøpte en ny bil.", "Vennligst lukk døren.",
+           "I dag har vi gjester."],
+    "pt": ["Onde fica o banheiro?", "Não sei o que dizer.",
+           "Ele comprou um carro novo.", "Por favor, feche a porta.",
+           "Hoje temos convidados."],
+    "sk": ["Kde sú toalety?", "Neviem, čo povedať.", "Kúpil si nové auto.",
+           "Prosím, zatvorte dvere.", "Dnes máme hostí."],
+    "sl": ["Kje je stranišče?", "Ne vem, kaj naj rečem.",
+           "Kupil je nov avto.", "Prosim, zaprite vrata.",
+           "Danes imamo goste."],
+    "sv": ["Var är toaletten?", "Jag vet inte vad jag ska säga.",
+           "Han köpte en ny bil.", "Var snäll och stäng dörren.",
+           "I dag har vi gäster."],
+}
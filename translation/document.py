@@ -0,0 +1,199 @@
+import html
+import re
+
+# Raw (never translated) HTML: comments, declarations, tags and the whole
+# content of elements holding code or non-text data. Attributes are part of
+# their tag, so they are kept raw too.
+_html_raw = re.compile(r"<!--.*?-->|<![^>]*>|<\?.*?\?>|"
+                       r"<(script|style|code|pre|textarea|kbd|samp)\b.*?"
+                       r"</\1\s*>|<[^>]*>", re.DOTALL | re.IGNORECASE)
+_md_fence = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+_md_prefix = re.compile(r"^\s*(?:#{1,6}\s+|>\s*|[-*+]\s+(?:\[[ xX]\]\s+)?|"
+                        r"\d+[.)]\s+)*")
+# Raw inline Markdown: code spans, link/image targets, autolinks, HTML tags,
+# bare URLs and table cell separators
+_md_raw = re.compile(r"(`+).*?\1|\]\([^)]*\)|\]\[[^\]]*\]|<[^>\s]+>|"
+                     r"<[^>]*>|https?://\S+|www\.\S+|!?\[|\|")
+_md_reference = re.compile(r"^\s{0,3}\[[^\]]+\]:\s")
+_letter = re.compile(r"[^\W\d_]")
+_spaces = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+_tag_name = re.compile(r"<(?:/\s*)?([a-zA-Z][\w-]*)")
+# Elements flowing within a sentence, kept inside its segment as tokens
+_html_inline = frozenset([
+    "a", "abbr", "b", "bdi", "bdo", "big", "br", "cite", "code", "data",
+    "del", "dfn", "em", "font", "i", "img", "ins", "kbd", "label", "mark",
+    "q", "s", "samp", "small", "span", "strike", "strong", "sub", "sup",
+    "time", "tt", "u", "var", "wbr"])
+_inline_token = re.compile(r"\{\s*~\s*(\d+)\s*\}")
+
+
+def _is_html_inline(match):
+    tag_name = _tag_name.match(match.group(0))
+    return bool(tag_name) and tag_name.group(1).lower() in _html_inline
+
+
+def _is_md_inline(match):
+    return match.group(0) != "|"  # Table cells are translated apart
+
+
+def _add_run(pieces, text, raw_pattern):
+    """
+    Appends text to pieces, as a segment from its first to its last text
+    only if it has words (raw markup in between stays in the segment)
+    """
+    gaps, position = [], 0
+    for match in raw_pattern.finditer(text):
+        gaps.append((position, match.start()))
+        position = match.end()
+    gaps.append((position, len(text)))
+    if not any(_letter.search(text, start, end) for start, end in gaps):
+        if text:
+            pieces.append((False, text))
+        return
+    filled = [(start, end) for start, end in gaps
+              if text[start:end].strip()]
+    start, end = filled[0][0], filled[-1][1]
+    leading, core, trailing = _spaces.match(text[start:end]).groups()
+    start, end = start + len(leading), end - len(trailing)
+    pieces.extend(((False, text[:start]), (True, text[start:end]),
+                   (False, text[end:])))
+
+
+def _split(text, raw_pattern, is_inline, pieces):
+    """
+    Splits text on raw_pattern matches that are not is_inline, appending
+    (is_segment, piece) to pieces
+    """
+    position = 0
+    for match in raw_pattern.finditer(text):
+        if not is_inline(match):
+            _add_run(pieces, text[position:match.start()], raw_pattern)
+            pieces.append((False, match.group(0)))
+            position = match.end()
+    _add_run(pieces, text[position:], raw_pattern)
+
+
+def split_html(text):
+    """
+    Returns (is_segment, piece) list, joining pieces gives back text.
+    Segments end at block elements, inline ones stay in their sentence.
+    >>> [piece for is_segment, piece in split_html(
+    ...     '<p title="Hi">Click <a href="/x">here</a> to go</p>'
+    ...     '<pre>x = 1</pre><p><b>Done</b></p>') if is_segment]
+    ['Click <a href="/x">here</a> to go', 'Done']
+    """
+    pieces = []
+    _split(text, _html_raw, _is_html_inline, pieces)
+    return pieces
+
+
+def split_markdown(text):
+    """
+    Returns (is_segment, piece) list, joining pieces gives back text
+    >>> [piece for is_segment, piece in split_markdown(
+    ...     "# Title\\n\\nSee `ls -l` or [the docs](http://x.io).\\n"
+    ...     "```\\ncode here\\n```\\n")
+    ...  if is_segment]
+    ['Title', 'See `ls -l` or [the docs](http://x.io).']
+    """
+    pieces = []
+    fence = None
+    indented_code = previous_blank = True
+    for line in text.splitlines(True):
+        fence_match = _md_fence.match(line)
+        indented = line.startswith(("    ", "\t"))
+        if fence:
+            pieces.append((False, line))
+            if fence_match and fence_match.group(1)[0] == fence[0] and \
+                    len(fence_match.group(1)) >= len(fence):
+                fence = None
+        elif fence_match:
+            fence = fence_match.group(1)
+            pieces.append((False, line))
+        elif indented and (previous_blank or indented_code):
+            indented_code = True
+            pieces.append((False, line))
+        elif _md_reference.match(line):
+            pieces.append((False, line))
+        else:
+            prefix = _md_prefix.match(line).group(0)
+            pieces.append((False, prefix))
+            _split(line[len(prefix):], _md_raw, _is_md_inline, pieces)
+        previous_blank = not line.strip()
+        if not indented and not previous_blank:
+            indented_code = False
+    return pieces
+
+
+def _unchanged(text):
+    return text
+
+
+def _escape_html(text):
+    return html.escape(text, quote=False)
+
+
+def mask_inline(segment, raw_pattern):
+    """
+    Returns segment with its raw markup replaced by {~N} tokens, and the
+    markup of each token
+    >>> mask_inline("Click <a href='/x'>here</a>", _html_raw)
+    ('Click {~0}here{~1}', ["<a href='/x'>", '</a>'])
+    """
+    values = []
+
+    def replace(match):
+        values.append(match.group(0))
+        return "{~" + str(len(values) - 1) + "}"
+
+    return raw_pattern.sub(replace, segment), values
+
+
+def unmask_inline(translated_text, values):
+    """Replaces {~N} tokens (spacing as the backend left it) by markup"""
+
+    def replace(match):
+        index = int(match.group(1))
+        return values[index] if index < len(values) else match.group(0)
+
+    return _inline_token.sub(replace, translated_text)
+
+
+# text_format: (splitter, inline markup, segment to text, translation to
+# document text)
+DOCUMENT_FORMATS = {
+    "html": (split_html, _html_raw, html.unescape, _escape_html),
+    "markdown": (split_markdown, _md_raw, _unchanged, _unchanged),
+}
+
+
+def translate_document(translator, document, text_format, source_lang,
+                       target_lang):
+    """
+    Translates only the text of an HTML/Markdown document, sending every
+    distinct segment once (in one batch), inline markup masked as {~N}
+    tokens so sentences are translated whole, returns (document, direction)
+    >>> from translation.offline import OfflineHelper
+    >>> translate_document(OfflineHelper(), "<li>Home</li><li>Home</li>"
+    ...                    "<p>Click <a href='/x'>here</a> to go</p>",
+    ...                    "html", "en", "de")
+    ("<li>[en-de] Home</li><li>[en-de] Home</li><p>[en-de] Click \
+<a href='/x'>here</a> to go</p>", 'en-de')
+    """
+    splitter, raw_pattern, unescape, escape = DOCUMENT_FORMATS[text_format]
+    pieces = splitter(document)
+    masked = {piece: mask_inline(piece, raw_pattern)
+              for is_segment, piece in pieces if is_segment}
+    segments = list(dict.fromkeys(masked_text
+                                  for masked_text, _ in masked.values()))
+    translated = translator.translate_batch(
+        [unescape(segment) for segment in segments], source_lang,
+        target_lang) if segments else []
+    translations = {segment: escape(translation) for segment, (
+        translation, _) in zip(segments, translated)}
+    direction = next((direction for _, direction in translated if direction),
+                     target_lang)
+    return "".join(unmask_inline(translations[masked[piece][0]],
+                                 masked[piece][1])
+                   if is_segment else piece
+                   for is_segment, piece in pieces), direction
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from translation.abc_translate import TranslateHelperABC
+
+
+class ConcurrentTranslateHelper(TranslateHelperABC):
+    """ConcurrentTranslateHelper - Translates independent texts in parallel"""
+
+    def __init__(self, helper, max_concurrency=8):
+        """Constructor for ConcurrentTranslateHelper - Wraps given helper"""
+        self.helper = helper
+        self.max_concurrency = max_concurrency
+        self.max_text_length = helper.max_text_length
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def translate(self, target_text, source_lang, target_lang):
+        return self.helper.translate(target_text, source_lang, target_lang)
+
+    def submit(self, target_text, source_lang, target_lang):
+        """Schedules a translation, returns a concurrent.futures.Future"""
+        return self.executor.submit(self.helper.translate, target_text,
+                                    source_lang, target_lang)
+
+    def translate_many(self, target_texts, source_lang, target_lang):
+        """Translates every text concurrently, results keep input order"""
+        futures = [self.submit(target_text, source_lang, target_lang)
+                   for target_text in target_texts]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,177 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+
+
+def find_catalog(helper):
+    """Returns LanguageCatalog of helper (or of a helper it wraps), or None"""
+    while helper is not None:
+        if getattr(helper, "catalog", None) is not None:
+            return helper.catalog
+        helper = getattr(helper, "helper", None)
+    return None
+
+
+class FanOutTranslateHelper(TranslateHelperABC):
+    """FanOutTranslateHelper - Many targets at once, pivoting when needed"""
+
+    def __init__(self, helper, catalog=None, max_concurrency=8, hubs=None):
+        """
+        Constructor for FanOutTranslateHelper - Wraps given helper, routing
+        directions missing from catalog (Default: the wrapped helper's one)
+        through a hub language
+        >>> from translation.catalog import LanguageCatalog
+        >>> from translation.offline import OfflineHelper
+        >>> catalog = LanguageCatalog(["az-ru", "ru-en", "ru-de", "en-de"])
+        >>> helper = FanOutTranslateHelper(OfflineHelper(), catalog)
+        >>> helper.translate("Salam", "az", "en")
+        ('[ru-en] [az-ru] Salam', 'az-ru-en')
+        >>> for result in helper.translate_targets("Salam", "az",
+        ...                                        ["ru", "en", "de"]):
+        ...     print(result["target"], result["translation"])
+        ru [az-ru] Salam
+        en [ru-en] [az-ru] Salam
+        de [ru-de] [az-ru] Salam
+        >>> helper.translate("Salam", "az", "az")
+        ('Salam', 'az-az')
+        >>> helper.shutdown()
+        """
+        self.helper = helper
+        self.catalog = catalog or find_catalog(helper)
+        self.hubs = hubs
+        self.max_text_length = helper.max_text_length
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def route(self, source_lang, target_lang):
+        """Returns hub language to pivot through, None for direct ones"""
+        if self.catalog is None or source_lang in ("auto", target_lang) or \
+                self.catalog.supports(source_lang, target_lang):
+            return None
+        return self.catalog.pivot(source_lang, target_lang, self.hubs)
+
+    def translate(self, target_text, source_lang, target_lang):
+        if source_lang == "auto" and self.catalog is not None and \
+                not self.catalog.supports_target(target_lang):
+            source_lang = self.detect(target_text)
+        if source_lang == target_lang:
+            return target_text, source_lang + "-" + target_lang
+        hub = self.route(source_lang, target_lang)
+        if not hub:
+            return self.helper.translate(target_text, source_lang,
+                                         target_lang)
+        pivot_text, pivot_direction = self.helper.translate(
+            target_text, source_lang, hub)
+        translation, _ = self.helper.translate(pivot_text, hub, target_lang)
+        return translation, pivot_direction + "-" + target_lang
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        if source_lang == target_lang:
+            return [(target_text, source_lang + "-" + target_lang)
+                    for target_text in target_texts]
+        hub = self.route(source_lang, target_lang)
+        if not hub:
+            return self.helper.translate_batch(target_texts, source_lang,
+                                               target_lang)
+        pivoted = self.helper.translate_batch(target_texts, source_lang, hub)
+        translated = self.helper.translate_batch(
+            [pivot_text for pivot_text, _ in pivoted], hub, target_lang)
+        return [(translation, pivot_direction + "-" + target_lang)
+                for (translation, _), (_, pivot_direction)
+                in zip(translated, pivoted)]
+
+    async def adetect(self, target_text):
+        return await self.helper.adetect(target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        if source_lang == "auto" and self.catalog is not None and \
+                not self.catalog.supports_target(target_lang):
+            source_lang = await self.adetect(target_text)
+        if source_lang == target_lang:
+            return target_text, source_lang + "-" + target_lang
+        hub = self.route(source_lang, target_lang)
+        if not hub:
+            return await self.helper.atranslate(target_text, source_lang,
+                                                target_lang)
+        pivot_text, pivot_direction = await self.helper.atranslate(
+            target_text, source_lang, hub)
+        translation, _ = await self.helper.atranslate(pivot_text, hub,
+                                                      target_lang)
+        return translation, pivot_direction + "-" + target_lang
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        if source_lang == target_lang:
+            return [(target_text, source_lang + "-" + target_lang)
+                    for target_text in target_texts]
+        hub = self.route(source_lang, target_lang)
+        if not hub:
+            return await self.helper.atranslate_batch(
+                target_texts, source_lang, target_lang)
+        pivoted = await self.helper.atranslate_batch(target_texts,
+                                                     source_lang, hub)
+        translated = await self.helper.atranslate_batch(
+            [pivot_text for pivot_text, _ in pivoted], hub, target_lang)
+        return [(translation, pivot_direction + "-" + target_lang)
+                for (translation, _), (_, pivot_direction)
+                in zip(translated, pivoted)]
+
+    def _translate_leg(self, target_text, source_lang, target_lang):
+        if source_lang == target_lang:
+            # Nothing to translate, text is already in the target language
+            return target_text, source_lang + "-" + target_lang
+        try:
+            return self.helper.translate(target_text, source_lang,
+                                         target_lang)
+        except (TranslateExceptionABC, OSError) as exception:
+            return exception
+
+    def _translate_pivoted(self, hub_future, hub, target_lang):
+        pivoted = hub_future.result()
+        if isinstance(pivoted, BaseException):
+            return pivoted
+        return self._translate_leg(pivoted[0], hub, target_lang)
+
+    def translate_targets(self, target_text, source_lang, target_langs):
+        """
+        Translates target_text to every target language concurrently, each
+        hub translation being requested once for all targets pivoting on
+        it. Returns a dict per target (same order), with 'target' plus
+        'translation', 'direction' and 'pivot' (hub or None), or 'error'.
+        """
+        if source_lang == "auto" and self.catalog is not None:
+            # Detected once, instead of by the backend for every target
+            source_lang = self.detect(target_text)
+        routes = [(target_lang, self.route(source_lang, target_lang))
+                  for target_lang in target_langs]
+        # Legs from the source language (to targets or hubs) are queued
+        # first, so pivoted legs only ever wait on already running ones
+        legs = {}
+        for target_lang, hub in routes:
+            leg_target = hub or target_lang
+            if leg_target not in legs:
+                legs[leg_target] = self.executor.submit(
+                    self._translate_leg, target_text, source_lang,
+                    leg_target)
+        pivoted = {target_lang: self.executor.submit(
+            self._translate_pivoted, legs[hub], hub, target_lang)
+            for target_lang, hub in routes if hub}
+        results = []
+        for target_lang, hub in routes:
+            result = (pivoted[target_lang] if hub
+                      else legs[target_lang]).result()
+            if isinstance(result, BaseException):
+                results.append({"target": target_lang, "pivot": hub,
+                                "error": "{0}".format(result)})
+                continue
+            translation, direction = result
+            if hub:
+                direction = legs[hub].result()[1] + "-" + target_lang
+            results.append({"target": target_lang, "pivot": hub,
+                            "translation": translation,
+                            "direction": direction})
+        return results
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
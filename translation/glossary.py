@@ -0,0 +1,306 @@
+import collections
+import hashlib
+import json
+import os
+import re
+
+from translation.abc_translate import TranslateHelperABC
+
+_token = re.compile(r"\{\s*=\s*(\d+)\s*\}")
+
+
+class TermMatcher(object):
+    """TermMatcher - Aho-Corasick automaton finding many terms in one pass"""
+
+    def __init__(self, terms):
+        """
+        Constructor for TermMatcher - Compiles terms into an automaton,
+        plain lists and dicts only so it is stored as JSON
+        >>> matcher = TermMatcher(["he", "she", "hers"])
+        >>> list(matcher.finditer("she says hers"))
+        [(0, 3, 'she'), (9, 13, 'hers')]
+        """
+        self.goto = [{}]  # state -> {char: state}
+        self.fail = [0]
+        self.lengths = [()]  # state -> lengths of the terms ending there
+        for term in terms:
+            state = 0
+            for char in term:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.lengths.append(())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            if term and len(term) not in self.lengths[state]:
+                self.lengths[state] += (len(term),)
+        # Breadth first, so fail links always point at finished states
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.lengths[child] += self.lengths[self.fail[child]]
+
+    def state(self):
+        """Returns the automaton as JSON compatible lists"""
+        return [self.goto, self.fail, [list(lengths)
+                                       for lengths in self.lengths]]
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Returns TermMatcher of a state() (ValueError if it is not one)
+        >>> matcher = TermMatcher.from_state(json.loads(json.dumps(
+        ...     TermMatcher(["cart"]).state())))
+        >>> list(matcher.finditer("a cart"))
+        [(2, 6, 'cart')]
+        """
+        try:
+            goto, fail, lengths = state
+            matcher = cls.__new__(cls)
+            matcher.goto = [{str(char): int(child)
+                             for char, child in children.items()}
+                            for children in goto]
+            matcher.fail = [int(fallback) for fallback in fail]
+            matcher.lengths = [tuple(int(length) for length in ends)
+                               for ends in lengths]
+        except (TypeError, AttributeError):
+            raise ValueError("Not a TermMatcher state")
+        states = len(matcher.goto)
+        if not states == len(matcher.fail) == len(matcher.lengths) or \
+                not all(0 <= state < states for state in matcher.fail) or \
+                not all(0 <= child < states for children in matcher.goto
+                        for child in children.values()):
+            raise ValueError("Not a TermMatcher state")
+        return matcher
+
+    def finditer(self, text):
+        """
+        Yields (start, end, term) of the leftmost longest, non overlapping
+        terms of text that are not part of a longer word
+        >>> matcher = TermMatcher(["New York", "York", "Yorkshire"])
+        >>> list(matcher.finditer("New York or Yorkshire, not Yorks"))
+        [(0, 8, 'New York'), (12, 21, 'Yorkshire')]
+        """
+        longest = {}  # start -> end
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            end = position + 1
+            if end < len(text) and text[end].isalnum():
+                continue
+            for length in self.lengths[state]:
+                start = end - length
+                if (not start or not text[start - 1].isalnum()) and \
+                        end > longest.get(start, 0):
+                    longest[start] = end
+        covered = 0
+        for start in sorted(longest):
+            if start >= covered:
+                covered = longest[start]
+                yield start, covered, text[start:covered]
+
+
+def normalized_terms(terms):
+    """Returns pair terms as {pair: {term: translation}} dicts"""
+    return {pair: dict(pair_terms) if isinstance(pair_terms, dict)
+            else {term: term for term in pair_terms}
+            for pair, pair_terms in (terms or {}).items()}
+
+
+def glossary_digest(keep=None, terms=None):
+    """
+    Returns a digest identifying a glossary, without compiling it
+    >>> glossary_digest(["babelPy"]) == Glossary(["babelPy"]).digest
+    True
+    """
+    return hashlib.sha1(json.dumps(
+        [list(keep or []), normalized_terms(terms)], sort_keys=True
+    ).encode("utf-8")).hexdigest()
+
+
+class Glossary(object):
+    """Glossary - Terms kept as is, or forced, per language pair"""
+
+    def __init__(self, keep=None, terms=None, cache_path=None):
+        """
+        Constructor for Glossary - keep lists terms never translated, terms
+        maps a "src-tgt" pair to {term: translation} (or to a list of terms
+        kept as is for that pair). Compiled automata are stored as JSON at
+        cache_path (never pickled, as loading a tampered pickle would run
+        code) and reused while the glossary does not change.
+        >>> glossary = Glossary(["babelPy"], {"en-de": {"cart": "Warenkorb"}})
+        >>> masked, values = glossary.mask("babelPy cart", "en", "de")
+        >>> masked, values
+        ('{=0} {=1}', ['babelPy', 'Warenkorb'])
+        >>> glossary.unmask("{=1} von {= 0}", values)
+        'Warenkorb von babelPy'
+        >>> glossary.mask("babelPy cart", "en", "fr")
+        ('{=0} cart', ['babelPy'])
+        """
+        self.keep = list(keep or [])
+        self.terms = normalized_terms(terms)
+        self.digest = glossary_digest(self.keep, self.terms)
+        self.matchers = self._load(cache_path)
+        if self.matchers is None:
+            self.matchers = {pair: TermMatcher(self._pair_terms(pair))
+                             for pair in ["*"] + sorted(self.terms)}
+            self._store(cache_path)
+
+    def __bool__(self):
+        return bool(self.keep or self.terms)
+
+    def _pair_terms(self, pair):
+        pair_terms = {term: term for term in self.keep}
+        pair_terms.update(self.terms.get(pair, {}))
+        return pair_terms
+
+    def _load(self, cache_path):
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, encoding="utf-8") as cache_file:
+                stored = json.load(cache_file)
+            if stored.get("digest") != self.digest:
+                return None
+            return {pair: TermMatcher.from_state(state)
+                    for pair, state in stored["matchers"].items()}
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+    def _store(self, cache_path):
+        if not cache_path:
+            return
+        try:
+            with open(cache_path + ".tmp", "w",
+                      encoding="utf-8") as cache_file:
+                json.dump({"digest": self.digest,
+                           "matchers": {pair: matcher.state() for pair,
+                                        matcher in self.matchers.items()}},
+                          cache_file, ensure_ascii=False,
+                          separators=(",", ":"))
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass  # Compiling again next time is only slower
+
+    def needs_source(self, target_lang):
+        """Whether pair specific terms exist for translations to target_lang"""
+        return any(pair.endswith("-" + target_lang) for pair in self.terms)
+
+    def mask(self, text, source_lang, target_lang):
+        """
+        Returns text with glossary terms replaced by {=N} tokens, and the
+        value (kept term or its forced translation) of each token
+        """
+        pair = source_lang + "-" + target_lang
+        pair_terms = self.terms.get(pair, {})
+        matcher = self.matchers.get(pair, self.matchers["*"])
+        pieces, values, copied = [], [], 0
+        for start, end, term in matcher.finditer(text):
+            pieces.append(text[copied:start])
+            pieces.append("{=" + str(len(values)) + "}")
+            values.append(pair_terms.get(term, term))
+            copied = end
+        if not values:
+            return text, values
+        pieces.append(text[copied:])
+        return "".join(pieces), values
+
+    @staticmethod
+    def unmask(translated_text, values):
+        """Replaces {=N} tokens (spacing as the backend left it) by values"""
+        if not values:
+            return translated_text
+
+        def replace(match):
+            index = int(match.group(1))
+            return values[index] if index < len(values) else match.group(0)
+
+        return _token.sub(replace, translated_text)
+
+
+class GlossaryTranslateHelper(TranslateHelperABC):
+    """GlossaryTranslateHelper - Protects glossary terms of a helper"""
+
+    def __init__(self, helper, glossary):
+        """
+        Constructor for GlossaryTranslateHelper - Wraps given helper
+        >>> from translation.offline import OfflineHelper
+        >>> helper = GlossaryTranslateHelper(OfflineHelper(),
+        ...                                  Glossary(["babelPy"]))
+        >>> helper.translate("Use babelPy", "en", "de")
+        ('[en-de] Use babelPy', 'en-de')
+        """
+        self.helper = helper
+        self.glossary = glossary
+        self.max_text_length = helper.max_text_length
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def load_catalog(self, cache_path, ttl=None):
+        self.helper.load_catalog(cache_path, ttl)
+
+    def _source_lang(self, target_texts, source_lang, target_lang):
+        if source_lang == "auto" and self.glossary.needs_source(target_lang):
+            # Pair specific terms need the source language before masking
+            return self.helper.detect(" ".join(target_texts))
+        return source_lang
+
+    def translate(self, target_text, source_lang, target_lang):
+        source_lang = self._source_lang([target_text], source_lang,
+                                        target_lang)
+        masked, values = self.glossary.mask(target_text, source_lang,
+                                            target_lang)
+        translation, direction = self.helper.translate(masked, source_lang,
+                                                       target_lang)
+        return self.glossary.unmask(translation, values), direction
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        source_lang = self._source_lang(target_texts, source_lang,
+                                        target_lang)
+        masked = [self.glossary.mask(target_text, source_lang, target_lang)
+                  for target_text in target_texts]
+        translated = self.helper.translate_batch(
+            [masked_text for masked_text, _ in masked], source_lang,
+            target_lang)
+        return self._unmask_all(translated, masked)
+
+    def _unmask_all(self, translated, masked):
+        return [(self.glossary.unmask(translation, values), direction)
+                for (translation, direction), (_, values)
+                in zip(translated, masked)]
+
+    async def _asource_lang(self, target_texts, source_lang, target_lang):
+        if source_lang == "auto" and self.glossary.needs_source(target_lang):
+            return await self.helper.adetect(" ".join(target_texts))
+        return source_lang
+
+    async def adetect(self, target_text):
+        return await self.helper.adetect(target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        source_lang = await self._asource_lang([target_text], source_lang,
+                                               target_lang)
+        masked, values = self.glossary.mask(target_text, source_lang,
+                                            target_lang)
+        translation, direction = await self.helper.atranslate(
+            masked, source_lang, target_lang)
+        return self.glossary.unmask(translation, values), direction
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        source_lang = await self._asource_lang(target_texts, source_lang,
+                                               target_lang)
+        masked = [self.glossary.mask(target_text, source_lang, target_lang)
+                  for target_text in target_texts]
+        translated = await self.helper.atranslate_batch(
+            [masked_text for masked_text, _ in masked], source_lang,
+            target_lang)
+        return self._unmask_all(translated, masked)
@@ -0,0 +1,233 @@
+import collections
+import json
+import math
+import os
+import threading
+import time
+
+_recorder = None  # Disabled unless enable() is called
+
+
+class _NullSpan(object):
+    """Shared no-op span returned while instrumentation is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+def percentile(samples, share):
+    """
+    Returns the nearest-rank percentile (share in 0..1) of samples
+    >>> percentile([4, 1, 3, 2], 0.5)
+    2
+    >>> percentile(range(1, 21), 0.95), percentile(range(1, 11), 0.5)
+    (19, 5)
+    """
+    ordered = sorted(samples)
+    rank = int(math.ceil(share * len(ordered))) - 1
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+class _Span(object):
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add_span(self.name, self.started_at,
+                               time.perf_counter(), self.args)
+        return False
+
+
+class Recorder(object):
+    """Recorder - Collects spans and labelled counters of one process"""
+
+    def __init__(self, keep_events=True, max_events=100000, origin=None):
+        """
+        Constructor for Recorder - Span events are kept (up to max_events,
+        the oldest dropped first) only with keep_events, for trace export.
+        Trace timestamps are relative to perf_counter() origin (Default:
+        now)
+        >>> recorder = Recorder()
+        >>> recorder.count("babelpy_requests_total", backend="offline")
+        >>> recorder.add_span("translate", 1.0, 1.5)
+        >>> print(recorder.prometheus_text())  # doctest: +ELLIPSIS
+        # TYPE babelpy_requests_total counter
+        babelpy_requests_total{backend="offline"} 1
+        # TYPE babelpy_span_seconds summary
+        babelpy_span_seconds_sum{span="translate"} 0.5
+        babelpy_span_seconds_count{span="translate"} 1
+        ...
+        """
+        self.lock = threading.Lock()
+        self.events = collections.deque(maxlen=max_events) \
+            if keep_events else None
+        self.counters = collections.Counter()  # (name, labels) -> value
+        self.span_totals = {}  # span name -> [seconds, count]
+        self.gauges = []  # [(prefix, stats function)]
+        self.origin = time.perf_counter() if origin is None else origin
+
+    def add_span(self, name, started_at, ended_at, args=None):
+        """Records a span from perf_counter() started_at to ended_at"""
+        with self.lock:
+            totals = self.span_totals.setdefault(name, [0.0, 0])
+            totals[0] += ended_at - started_at
+            totals[1] += 1
+            if self.events is not None:
+                self.events.append((name, started_at, ended_at,
+                                    threading.get_ident(), args))
+
+    def count(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def register_gauges(self, prefix, stats_function):
+        """Exports stats_function() dict values as prefix_<key> gauges"""
+        with self.lock:
+            self.gauges.append((prefix, stats_function))
+
+    def trace_events(self):
+        """Returns Chrome trace-event dicts (complete events and counters)"""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events or ())
+            counters = list(self.counters.items())
+        trace = [{"name": "process_name", "ph": "M", "pid": pid,
+                  "args": {"name": "babelPy"}}]
+        for name, started_at, ended_at, thread_id, args in events:
+            trace.append({"name": name, "ph": "X", "pid": pid,
+                          "tid": thread_id,
+                          "ts": (started_at - self.origin) * 1e6,
+                          "dur": (ended_at - started_at) * 1e6,
+                          "args": args or {}})
+        now = (time.perf_counter() - self.origin) * 1e6
+        for (name, labels), value in counters:
+            series = name + "".join("." + str(label_value)
+                                    for _, label_value in labels)
+            trace.append({"name": series, "ph": "C", "pid": pid, "ts": now,
+                          "args": {"value": value}})
+        return trace
+
+    def write_trace(self, trace_path):
+        """Writes recorded spans as Chrome trace JSON (chrome://tracing)"""
+        with open(trace_path, "w") as trace_file:
+            json.dump({"traceEvents": self.trace_events(),
+                       "displayTimeUnit": "ms"}, trace_file)
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ""
+        return "{" + ",".join('{0}="{1}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in labels) + "}"
+
+    def prometheus_text(self):
+        """Returns counters, span totals and gauges in Prometheus format"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            span_totals = sorted(self.span_totals.items())
+            gauges = list(self.gauges)
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                lines.append("# TYPE {0} counter".format(name))
+                last_name = name
+            lines.append("{0}{1} {2}".format(name, self._labels(labels),
+                                             value))
+        if span_totals:
+            lines.append("# TYPE babelpy_span_seconds summary")
+        for span_name, (seconds, span_count) in span_totals:
+            labels = self._labels((("span", span_name),))
+            lines.append("babelpy_span_seconds_sum{0} {1}".format(labels,
+                                                                  seconds))
+            lines.append("babelpy_span_seconds_count{0} {1}".format(
+                labels, span_count))
+        for prefix, stats_function in gauges:
+            for stat_name, stat_value in sorted(stats_function().items()):
+                name = prefix + "_" + stat_name
+                lines.append("# TYPE {0} gauge".format(name))
+                if isinstance(stat_value, str):
+                    # e.g. circuit breaker state, as an info style gauge
+                    lines.append("{0}{1} 1".format(name, self._labels(
+                        ((stat_name, stat_value),))))
+                elif stat_value is not None:
+                    lines.append("{0} {1}".format(name, float(stat_value)))
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, metrics_path):
+        """Atomically writes Prometheus text (node exporter textfile)"""
+        temp_path = metrics_path + ".tmp"
+        with open(temp_path, "w") as metrics_file:
+            metrics_file.write(self.prometheus_text())
+        os.replace(temp_path, metrics_path)
+
+    def export_metrics(self, metrics_path, interval=15.0):
+        """Rewrites metrics_path every interval seconds from a thread"""
+        def export_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_metrics(metrics_path)
+                except OSError:
+                    pass  # Retried on next interval
+
+        exporter = threading.Thread(target=export_loop,
+                                    name="metrics-export", daemon=True)
+        exporter.start()
+        return exporter
+
+
+def enable(keep_events=True, origin=None):
+    """Starts recording spans and counters, returns the Recorder"""
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder(keep_events, origin=origin)
+    elif keep_events and _recorder.events is None:
+        _recorder.events = collections.deque(maxlen=100000)
+    return _recorder
+
+
+def recorder():
+    """Returns the active Recorder, None while disabled"""
+    return _recorder
+
+
+def span(name, **args):
+    """
+    Returns a context manager timing the enclosed block as a span
+    (a shared no-op one while instrumentation is disabled)
+    >>> with span("settings"):
+    ...     pass
+    """
+    if _recorder is None:
+        return _null_span
+    return _Span(_recorder, name, args)
+
+
+def add_span(name, started_at, ended_at, args=None):
+    if _recorder is not None:
+        _recorder.add_span(name, started_at, ended_at, args)
+
+
+def count(name, value=1, **labels):
+    """Adds value to a labelled counter (no-op while disabled)"""
+    if _recorder is not None:
+        _recorder.count(name, value, **labels)
+
+
+def register_gauges(prefix, stats_function):
+    if _recorder is not None:
+        _recorder.register_gauges(prefix, stats_function)
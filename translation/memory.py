@@ -0,0 +1,306 @@
+import os
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+
+from translation.abc_translate import TranslateHelperABC
+
+_placeholder = re.compile(r"\d+(?:[.,:/-]\d+)*|%[sd]|\{\w*\}")
+_masked = re.compile(r"\{#(\d+)\}")
+_xml_lang = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def mask(text):
+    """
+    Returns text with numbers/placeholders masked, and the masked values
+    >>> mask("Order 66 shipped on 2024-01-02")
+    ('Order {#0} shipped on {#1}', ['66', '2024-01-02'])
+    """
+    values = []
+
+    def replace(match):
+        values.append(match.group(0))
+        return "{#" + str(len(values) - 1) + "}"
+
+    return _placeholder.sub(replace, text), values
+
+
+def unmask(masked_text, values):
+    """
+    Fills masked_text placeholders with values, None if they do not fit
+    >>> unmask("Pedido {#0} enviado el {#1}", ["67", "2024-02-03"])
+    'Pedido 67 enviado el 2024-02-03'
+    """
+    try:
+        return _masked.sub(lambda match: values[int(match.group(1))],
+                           masked_text)
+    except IndexError:
+        return None
+
+
+class TranslationMemory(object):
+    """TranslationMemory - Segment pairs with a fuzzy n-gram index"""
+
+    default_threshold = 0.85
+
+    def __init__(self, tmx_path=None, threshold=None):
+        """
+        Constructor for TranslationMemory - Loads tmx_path if it exists,
+        threshold is the least similarity of suggested segments
+        >>> memory = TranslationMemory()
+        >>> memory.add("Order 66 shipped to customer",
+        ...            "Pedido 66 enviado al cliente", "en", "es")
+        >>> memory.lookup("Order 67 shipped to customer", "en", "es")
+        ('Pedido 67 enviado al cliente', 'en-es')
+        >>> memory.lookup("Order 67 shipped to customers", "en", "es") is None
+        True
+        >>> [suggestion[:2] for suggestion in memory.suggest(
+        ...     "Order 67 shipped to customers", "en", "es")]
+        [('Order 66 shipped to customer', 'Pedido 67 enviado al cliente')]
+        >>> memory.suggest("Order 67 cancelled", "en", "es")
+        []
+        """
+        self.tmx_path = tmx_path
+        self.threshold = threshold or self.default_threshold
+        self.lock = threading.Lock()
+        self.segments = []  # [(source, target, source_lang, target_lang)]
+        self.entries = []  # [(masked source, masked target, n-gram set)]
+        self.exact = {}  # (source_lang, target_lang, masked) -> entry id
+        self.index = {}  # (source_lang, target_lang) -> {n-gram: {ids}}
+        self.dirty = False
+        if tmx_path and os.path.exists(tmx_path):
+            self.import_tmx(tmx_path)
+            self.dirty = False
+
+    @staticmethod
+    def _grams(masked_text):
+        """
+        Returns set of character trigrams of case/space normalized text
+        >>> sorted(TranslationMemory._grams("Hi  {#0}"))
+        [' hi', ' {#', '#0}', '0} ', 'hi ', 'i {', '{#0']
+        """
+        padded = " " + " ".join(masked_text.lower().split()) + " "
+        return frozenset(padded[start:start + 3]
+                         for start in range(len(padded) - 2))
+
+    def add(self, source, target, source_lang, target_lang):
+        """
+        Stores a translated segment pair (replacing an exact duplicate)
+        >>> memory = TranslationMemory()
+        >>> memory.add("Order 1 of 10", "Pedido 1 de 10", "en", "es")
+        >>> memory.lookup("Order 1 of 10", "en", "es")
+        ('Pedido 1 de 10', 'en-es')
+        >>> memory.add("Room 5", "Raum 5, Etage 15", "en", "de")
+        >>> memory.lookup("Room 7", "en", "de")
+        ('Raum 7, Etage 15', 'en-de')
+        """
+        masked_source, values = mask(source)
+        target_values = _placeholder.findall(target)
+
+        def replace(match):
+            # Target values copied from the source follow the source on
+            # reuse, unless repeated (which source value is it then?)
+            value = match.group(0)
+            if values.count(value) != 1 or target_values.count(value) != 1:
+                return value
+            return "{#" + str(values.index(value)) + "}"
+
+        masked_target = _placeholder.sub(replace, target)
+        key = source_lang, target_lang, masked_source
+        grams = self._grams(masked_source)
+        with self.lock:
+            self.dirty = True
+            if key in self.exact:
+                entry_id = self.exact[key]
+                self.segments[entry_id] = (source, target, source_lang,
+                                           target_lang)
+                self.entries[entry_id] = masked_source, masked_target, grams
+                return
+            entry_id = len(self.entries)
+            self.segments.append((source, target, source_lang, target_lang))
+            self.entries.append((masked_source, masked_target, grams))
+            self.exact[key] = entry_id
+            postings = self.index.setdefault((source_lang, target_lang), {})
+            for gram in grams:
+                postings.setdefault(gram, set()).add(entry_id)
+
+    def _directions(self, source_lang, target_lang):
+        if source_lang != "auto":
+            return [(source_lang, target_lang)]
+        return [direction for direction in self.index
+                if direction[1] == target_lang]
+
+    def _scores(self, direction, grams):
+        """Returns {entry id: Jaccard similarity} of entries sharing grams"""
+        overlaps = {}
+        postings = self.index.get(direction, {})
+        for gram in grams:
+            for entry_id in postings.get(gram, ()):
+                overlaps[entry_id] = overlaps.get(entry_id, 0) + 1
+        return {entry_id: overlap / float(len(grams) + len(
+                    self.entries[entry_id][2]) - overlap)
+                for entry_id, overlap in overlaps.items()}
+
+    def lookup(self, text, source_lang, target_lang):
+        """
+        Returns (translation, direction) of the stored segment equal to
+        text once numbers/placeholders are masked, None if there is none.
+        Similar segments may mean something else ("not", a plural...),
+        so they are only ever suggest()ed.
+        """
+        masked_text, values = mask(text)
+        with self.lock:
+            for direction in self._directions(source_lang, target_lang):
+                entry_id = self.exact.get(direction + (masked_text,))
+                if entry_id is not None:
+                    translation = unmask(self.entries[entry_id][1], values)
+                    if translation is not None:
+                        return translation, "-".join(direction)
+        return None
+
+    def suggest(self, text, source_lang, target_lang, limit=3):
+        """
+        Returns up to limit (stored source, translation, direction,
+        similarity) of segments at or above the similarity threshold, most
+        similar first, to be reviewed before use
+        """
+        masked_text, values = mask(text)
+        grams = self._grams(masked_text)
+        scored = []
+        with self.lock:
+            for direction in self._directions(source_lang, target_lang):
+                for entry_id, score in self._scores(direction,
+                                                    grams).items():
+                    if score >= self.threshold:
+                        scored.append((score, entry_id, direction))
+            scored.sort(key=lambda suggestion: -suggestion[0])
+            suggestions = []
+            for score, entry_id, direction in scored:
+                translation = unmask(self.entries[entry_id][1], values)
+                if translation is None:
+                    continue
+                suggestions.append((self.segments[entry_id][0], translation,
+                                    "-".join(direction), score))
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+    def __len__(self):
+        return len(self.entries)
+
+    def export_tmx(self, tmx_path):
+        """Writes every stored segment pair to a TMX 1.4 file"""
+        tmx = ElementTree.Element("tmx", version="1.4")
+        ElementTree.SubElement(tmx, "header", creationtool="babelPy",
+                               creationtoolversion="1", segtype="sentence",
+                               datatype="plaintext", adminlang="en",
+                               srclang="*all*", **{"o-tmf": "babelPy"})
+        body = ElementTree.SubElement(tmx, "body")
+        with self.lock:
+            segments = list(self.segments)
+        for source, target, source_lang, target_lang in segments:
+            unit = ElementTree.SubElement(body, "tu", srclang=source_lang)
+            for lang, text in ((source_lang, source), (target_lang, target)):
+                variant = ElementTree.SubElement(unit, "tuv",
+                                                 {_xml_lang: lang})
+                ElementTree.SubElement(variant, "seg").text = text
+        temp_path = tmx_path + ".tmp"
+        ElementTree.ElementTree(tmx).write(temp_path, encoding="utf-8",
+                                           xml_declaration=True)
+        os.replace(temp_path, tmx_path)
+
+    def import_tmx(self, tmx_path):
+        """Adds segment pairs of a TMX file, returns how many were read"""
+        imported = 0
+        for unit in ElementTree.parse(tmx_path).getroot().iter("tu"):
+            variants = [(variant.get(_xml_lang, variant.get("lang", "")),
+                         "".join(variant.find("seg").itertext()))
+                        for variant in unit.iter("tuv")
+                        if variant.find("seg") is not None]
+            source_lang = unit.get("srclang", variants[0][0]
+                                   if variants else "")
+            sources = [text for lang, text in variants if lang == source_lang]
+            for lang, text in variants:
+                if sources and lang != source_lang:
+                    self.add(sources[0], text, source_lang.split("-")[0],
+                             lang.split("-")[0])
+                    imported += 1
+        return imported
+
+    def save(self):
+        """Persists segments to the TMX file given at construction"""
+        if self.tmx_path and self.dirty:
+            self.export_tmx(self.tmx_path)
+            self.dirty = False
+
+
+class MemoryTranslateHelper(TranslateHelperABC):
+    """MemoryTranslateHelper - Serves remembered segments from a memory"""
+
+    def __init__(self, helper, memory):
+        """Constructor for MemoryTranslateHelper - Wraps given helper"""
+        self.helper = helper
+        self.memory = memory
+        self.max_text_length = helper.max_text_length
+
+    def detect(self, target_text):
+        return self.helper.detect(target_text)
+
+    def _remember(self, target_text, translation, direction):
+        if "-" in direction:
+            source_lang, target_lang = direction.split("-", 1)
+            self.memory.add(target_text, translation, source_lang,
+                            target_lang)
+
+    def translate(self, target_text, source_lang, target_lang):
+        remembered = self.memory.lookup(target_text, source_lang, target_lang)
+        if remembered:
+            return remembered
+        translation, direction = self.helper.translate(target_text,
+                                                       source_lang,
+                                                       target_lang)
+        self._remember(target_text, translation, direction)
+        return translation, direction
+
+    def _fill(self, target_texts, results, missing, translated):
+        """Remembers translations of the missing texts, filling results"""
+        for index, (translation, direction) in zip(missing, translated):
+            self._remember(target_texts[index], translation, direction)
+            results[index] = translation, direction
+        return results
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        results = [self.memory.lookup(target_text, source_lang, target_lang)
+                   for target_text in target_texts]
+        missing = [index for index, result in enumerate(results) if not result]
+        if not missing:
+            return results
+        translated = self.helper.translate_batch(
+            [target_texts[index] for index in missing], source_lang,
+            target_lang)
+        return self._fill(target_texts, results, missing, translated)
+
+    # Memory lookups are in-process and short, so they run on the event loop
+
+    async def adetect(self, target_text):
+        return await self.helper.adetect(target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        remembered = self.memory.lookup(target_text, source_lang, target_lang)
+        if remembered:
+            return remembered
+        translation, direction = await self.helper.atranslate(
+            target_text, source_lang, target_lang)
+        self._remember(target_text, translation, direction)
+        return translation, direction
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        results = [self.memory.lookup(target_text, source_lang, target_lang)
+                   for target_text in target_texts]
+        missing = [index for index, result in enumerate(results) if not result]
+        if not missing:
+            return results
+        translated = await self.helper.atranslate_batch(
+            [target_texts[index] for index in missing], source_lang,
+            target_lang)
+        return self._fill(target_texts, results, missing, translated)
@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+from translation import instrument
+from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+from translation.catalog import LanguageCatalog
+
+
+class OfflineHelperException(TranslateExceptionABC):
+    """
+    Default OfflineHelper exception
+    """
+    error_codes = {
+        503: "ERR_SERVICE_NOT_AVAILABLE",
+        505: "ERR_LANGUAGE_NOT_AVAILABLE",
+    }
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.msg = self.error_codes.get(status_code)
+
+    def __str__(self): return self.msg
+
+
+class OfflineHelper(TranslateHelperABC):
+    """OfflineHelper - Deterministic in-process backend for tests/benchmarks"""
+
+    languages = ['az', 'be', 'bg', 'ca', 'cs', 'da', 'de', 'el', 'en', 'es',
+                 'et', 'fi', 'fr', 'hr', 'hu', 'hy', 'it', 'lt', 'lv', 'mk',
+                 'nl', 'no', 'pl', 'pt', 'ro', 'ru', 'sk', 'sl', 'sq', 'sr',
+                 'sv', 'tr', 'uk']
+
+    def __init__(self, api_key=None, latency=0.0, error_rate=0.0, seed=0,
+                 limiter=None, **_backend_options):
+        """
+        Constructor for OfflineHelper - Needs no network nor API key
+        latency: seconds slept per request, error_rate: share (0..1) of
+        requests failing with ERR_SERVICE_NOT_AVAILABLE
+        >>> helper = OfflineHelper()
+        >>> helper.translate("Hello", "en", "de")
+        ('[en-de] Hello', 'en-de')
+        >>> helper.translate_batch(["a", "b"], "en", "fr")
+        [('[en-fr] a', 'en-fr'), ('[en-fr] b', 'en-fr')]
+        """
+        self.api_key = api_key
+        self.latency = float(latency)
+        self.error_rate = float(error_rate)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.limiter = limiter
+        self.catalog = LanguageCatalog(
+            source + "-" + target for source in self.languages
+            for target in self.languages if source != target)
+        self.detector = None
+
+    def _account(self, chars):
+        """Counts one emulated request, returns True if it has to fail"""
+        instrument.count("babelpy_requests_total", backend="offline")
+        instrument.count("babelpy_chars_total", chars, backend="offline")
+        with self.lock:
+            self.requests += 1
+            return self.random.random() < self.error_rate
+
+    def _request(self, chars):
+        """Emulates one API round trip: latency, accounting and failures"""
+        if self.limiter:
+            self.limiter.acquire(chars)
+        failed = self._account(chars)
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise OfflineHelperException(503)
+
+    async def _arequest(self, chars):
+        """Emulates one API round trip without blocking the event loop"""
+        import asyncio  # Only asyncio users pay for importing it
+
+        if self.limiter:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.limiter.acquire, chars)
+        failed = self._account(chars)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if failed:
+            raise OfflineHelperException(503)
+
+    def _direction(self, target_text, source_lang, target_lang):
+        if source_lang == "auto":
+            source_lang = self.detect(target_text)
+        if not self.catalog.supports(source_lang, target_lang):
+            raise OfflineHelperException(505)
+        return source_lang + "-" + target_lang
+
+    def detect(self, target_text):
+        if self.detector is None:
+            from translation.detect import NgramDetector
+
+            self.detector = NgramDetector(languages=self.languages)
+        return self.detector.detect(target_text)[0] or "en"
+
+    def translate(self, target_text, source_lang, target_lang):
+        direction = self._direction(target_text, source_lang, target_lang)
+        self._request(len(target_text))
+        return "[{0}] {1}".format(direction, target_text), direction
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        direction = self._direction(target_text, source_lang, target_lang)
+        await self._arequest(len(target_text))
+        return "[{0}] {1}".format(direction, target_text), direction
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        directions = [self._direction(target_text, source_lang, target_lang)
+                      for target_text in target_texts]
+        if target_texts:
+            self._request(sum(len(target_text)
+                              for target_text in target_texts))
+        return [("[{0}] {1}".format(direction, target_text), direction)
+                for target_text, direction in zip(target_texts, directions)]
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        directions = [self._direction(target_text, source_lang, target_lang)
+                      for target_text in target_texts]
+        if target_texts:
+            await self._arequest(sum(len(target_text)
+                                     for target_text in target_texts))
+        return [("[{0}] {1}".format(direction, target_text), direction)
+                for target_text, direction in zip(target_texts, directions)]
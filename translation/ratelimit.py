@@ -0,0 +1,108 @@
+import fcntl
+import json
+import os
+import time
+
+from translation.abc_translate import TranslateExceptionABC
+
+
+class RateLimitException(TranslateExceptionABC):
+    """
+    Default RateLimiter exception, raised before the API would refuse us
+    """
+    error_codes = {
+        403: "ERR_DAILY_REQ_LIMIT_EXCEEDED",
+        404: "ERR_DAILY_CHAR_LIMIT_EXCEEDED",
+    }
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.msg = self.error_codes.get(status_code) + " (client-side quota)"
+
+    def __str__(self): return self.msg
+
+
+class RateLimiter(object):
+    """RateLimiter - Token bucket and daily quota shared across processes"""
+
+    def __init__(self, state_path, requests_per_second=None, burst=None,
+                 daily_requests=None, daily_chars=None):
+        """
+        Constructor for RateLimiter - State is kept in a locked JSON file
+        requests_per_second: bucket refill rate (None: unlimited)
+        burst: bucket size, requests allowed at once (default: 1 second)
+        daily_requests, daily_chars: quotas per (UTC) day (None: unlimited)
+        """
+        self.state_path = state_path
+        self.rate = requests_per_second
+        self.burst = burst or max(requests_per_second or 1, 1)
+        self.daily_requests = daily_requests
+        self.daily_chars = daily_chars
+
+    @staticmethod
+    def _today():
+        return time.strftime("%Y-%m-%d", time.gmtime())
+
+    def _update(self, update_state):
+        """Runs update_state(state) holding an exclusive lock on the file"""
+        with open(self.state_path, "a+") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                try:
+                    state = json.loads(state_file.read() or "{}")
+                except ValueError:
+                    state = {}
+                if state.get("day") != self._today():
+                    state.update(day=self._today(), requests=0, chars=0)
+                result = update_state(state)
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(state, state_file)
+                return result
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+    def _try_acquire(self, state, chars):
+        """Takes a token, returns seconds to wait (0 when acquired)"""
+        if self.daily_requests and state["requests"] >= self.daily_requests:
+            raise RateLimitException(403)
+        if self.daily_chars and state["chars"] + chars > self.daily_chars:
+            raise RateLimitException(404)
+        now = time.time()
+        if self.rate:
+            elapsed = max(now - state.get("updated", now), 0)
+            tokens = min(state.get("tokens", self.burst) +
+                         elapsed * self.rate, self.burst)
+            state.update(tokens=tokens, updated=now)
+            if tokens < 1:
+                return (1 - tokens) / self.rate
+            state["tokens"] = tokens - 1
+        state["requests"] += 1
+        state["chars"] += chars
+        return 0
+
+    def acquire(self, chars=0):
+        """
+        Blocks until a request of given size may be sent, smoothing bursts
+        Raises RateLimitException once a daily quota would be exceeded
+        """
+        while True:
+            wait = self._update(lambda state: self._try_acquire(state, chars))
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def usage(self):
+        """Returns dict with usage and limits for the current day"""
+        state = {}
+        if os.path.exists(self.state_path):
+            state = self._update(dict)
+        return {
+            "day": self._today(),
+            "requests": state.get("requests", 0),
+            "chars": state.get("chars", 0),
+            "daily_requests": self.daily_requests,
+            "daily_chars": self.daily_chars,
+            "requests_per_second": self.rate,
+        }
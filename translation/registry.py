@@ -0,0 +1,52 @@
+import importlib
+
+ENTRY_POINT_GROUP = "babelpy.backends"
+
+# Backend name -> "module:HelperClass", imported only when requested
+BACKENDS = {
+    "offline": "translation.offline:OfflineHelper",
+    "router": "translation.router:RouterHelper",
+    "yandex": "translation.yandex:YandexHelper",
+}
+
+
+def _entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return {}
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        found = entry_points().get(ENTRY_POINT_GROUP, [])
+    return {entry_point.name: entry_point for entry_point in found}
+
+
+def register_backend(name, target):
+    """Registers a "module:HelperClass" target under given backend name"""
+    BACKENDS[name] = target
+
+
+def available_backends():
+    """
+    Returns sorted names of built-in, registered and installed backends
+    >>> "offline" in available_backends()
+    True
+    """
+    return sorted(set(BACKENDS) | set(_entry_points()))
+
+
+def load_backend(name):
+    """
+    Imports and returns the TranslateHelperABC subclass of given backend
+    >>> load_backend("offline").__name__
+    'OfflineHelper'
+    """
+    if name in BACKENDS:
+        module_name, class_name = BACKENDS[name].split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+    entry_point = _entry_points().get(name)
+    if entry_point is None:
+        raise ValueError("Unknown translate backend: {0} (available: {1})"
+                         .format(name, ", ".join(available_backends())))
+    return entry_point.load()
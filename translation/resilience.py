@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+
+from translation import instrument
+from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+
+
+class CircuitOpenException(TranslateExceptionABC):
+    """
+    Raised without calling the backend while its circuit breaker is open
+    """
+    error_codes = {
+        503: "ERR_SERVICE_NOT_AVAILABLE",
+    }
+
+    def __init__(self, status_code=503):
+        self.status_code = status_code
+        self.msg = self.error_codes.get(status_code) + " (circuit open)"
+
+    def __str__(self): return self.msg
+
+
+def is_retryable(exception, retryable_codes):
+    """Returns True for network errors and retryable backend error codes"""
+    if isinstance(exception, CircuitOpenException):
+        return False
+    if isinstance(exception, TranslateExceptionABC):
+        return getattr(exception, "status_code", None) in retryable_codes
+    return isinstance(exception, OSError)
+
+
+class RetryPolicy(object):
+    """RetryPolicy - Jittered exponential backoff for retryable failures"""
+
+    def __init__(self, retries=2, base_delay=0.2, max_delay=5.0,
+                 retryable_codes=(503,)):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_codes = frozenset(retryable_codes)
+
+    def delay(self, attempt):
+        """
+        Returns seconds to wait before given retry attempt (full jitter)
+        >>> 0 <= RetryPolicy(base_delay=1).delay(3) <= 8
+        True
+        """
+        return random.uniform(0, min(self.max_delay,
+                                     self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker(object):
+    """CircuitBreaker - Fails fast after repeated backend failures"""
+
+    closed, open, half_open = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Constructor for CircuitBreaker - Opens after failure_threshold
+        consecutive failures, lets one trial call through reset_timeout
+        seconds later (half open) and closes again when it succeeds
+        >>> breaker = CircuitBreaker(failure_threshold=1)
+        >>> breaker.allow()
+        True
+        >>> breaker.record_failure()
+        >>> breaker.state, breaker.allow()
+        ('open', False)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Returns True if a call may be sent to the backend now"""
+        with self.lock:
+            if self.state == self.open:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.half_open
+                return True
+            if self.state == self.half_open:
+                # Only the single trial call is let through
+                self.rejected += 1
+                return False
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.closed
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.half_open or \
+                    self.failures >= self.failure_threshold:
+                if self.state != self.open:
+                    self.times_opened += 1
+                self.state = self.open
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        """Returns dict with breaker state and counters"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+        }
+
+
+class ResilientTranslateHelper(TranslateHelperABC):
+    """ResilientTranslateHelper - Retries and circuit breaking for a helper"""
+
+    def __init__(self, helper, retry_policy=None, circuit_breaker=None):
+        """Constructor for ResilientTranslateHelper - Wraps given helper"""
+        self.helper = helper
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_text_length = helper.max_text_length
+        self.retries = 0
+
+    def _allow(self):
+        if not self.circuit_breaker.allow():
+            instrument.count("babelpy_errors_total", code="circuit_open")
+            raise CircuitOpenException()
+
+    def _retry_delay(self, exception, attempt):
+        """
+        Records a failed attempt, returns seconds to wait before the next
+        one (None if exception is to be raised)
+        """
+        instrument.count("babelpy_errors_total", code=getattr(
+            exception, "status_code", type(exception).__name__))
+        if not is_retryable(exception, self.retry_policy.retryable_codes):
+            # Not an availability problem, so it must not keep a half open
+            # breaker waiting for its trial call
+            self.circuit_breaker.record_success()
+            return None
+        self.circuit_breaker.record_failure()
+        if attempt >= self.retry_policy.retries:
+            return None
+        self.retries += 1
+        return self.retry_policy.delay(attempt)
+
+    def call(self, function, *args):
+        """Calls function(*args), retrying/tripping on retryable failures"""
+        attempt = 0
+        while True:
+            self._allow()
+            try:
+                result = function(*args)
+            except (TranslateExceptionABC, OSError) as exception:
+                delay = self._retry_delay(exception, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    async def acall(self, function, *args):
+        """Coroutine counterpart of call(), awaiting function(*args)"""
+        import asyncio  # Here, as it is slow to import and CLI runs skip it
+
+        attempt = 0
+        while True:
+            self._allow()
+            try:
+                result = await function(*args)
+            except (TranslateExceptionABC, OSError) as exception:
+                delay = self._retry_delay(exception, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    def detect(self, target_text):
+        return self.call(self.helper.detect, target_text)
+
+    def load_catalog(self, cache_path, ttl=None):
+        self.helper.load_catalog(cache_path, ttl)
+
+    def translate(self, target_text, source_lang, target_lang):
+        return self.call(self.helper.translate, target_text, source_lang,
+                         target_lang)
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        return self.call(self.helper.translate_batch, target_texts,
+                         source_lang, target_lang)
+
+    async def adetect(self, target_text):
+        return await self.acall(self.helper.adetect, target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        return await self.acall(self.helper.atranslate, target_text,
+                                source_lang, target_lang)
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        return await self.acall(self.helper.atranslate_batch, target_texts,
+                                source_lang, target_lang)
+
+    def stats(self):
+        """Returns dict with retry and circuit breaker metrics"""
+        stats = self.circuit_breaker.stats()
+        stats["retries"] = self.retries
+        return stats
@@ -0,0 +1,355 @@
+import collections
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from translation import instrument
+from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+from translation.fanout import find_catalog
+from translation.registry import load_backend
+from translation.resilience import is_retryable
+
+
+class RouteStats(object):
+    """RouteStats - Latency and error tracking of a single route"""
+
+    def __init__(self, name, alpha=0.2, window=256):
+        """
+        Constructor for RouteStats - alpha weights new samples in the
+        moving averages, window is how many latencies percentiles use
+        >>> stats = RouteStats("yandex")
+        >>> stats.record_success(0.1); stats.record_success(0.2)
+        >>> round(stats.ewma, 2), stats.percentile(0.95)
+        (0.12, 0.2)
+        """
+        self.name = name
+        self.alpha = alpha
+        self.samples = collections.deque(maxlen=window)
+        self.ewma = None  # Seconds, None until the first success
+        self.error_ewma = 0.0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.requests = self.errors = self.hedges = self.wins = 0
+
+    def record_success(self, latency):
+        self.samples.append(latency)
+        self.ewma = latency if self.ewma is None else \
+            self.alpha * latency + (1 - self.alpha) * self.ewma
+        self.error_ewma *= 1 - self.alpha
+        self.consecutive_failures = 0
+
+    def record_failure(self, max_failures, max_error_rate, cooldown):
+        self.errors += 1
+        self.error_ewma = self.alpha + (1 - self.alpha) * self.error_ewma
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= max_failures or \
+                self.error_ewma > max_error_rate:
+            self.down_until = time.monotonic() + cooldown
+
+    def percentile(self, share):
+        return instrument.percentile(self.samples, share) \
+            if self.samples else None
+
+    def score(self):
+        """Expected latency, penalized by recent errors (lower is better)"""
+        return (self.ewma or 0.0) / (1.0 - min(self.error_ewma, 0.9))
+
+
+class Route(object):
+    """Route - A backend helper the router can send requests to"""
+
+    def __init__(self, name, helper):
+        self.name = name
+        self.helper = helper
+        self.stats = RouteStats(name)
+
+
+class RouterHelper(TranslateHelperABC):
+    """RouterHelper - Latency aware routing over many backends, hedged"""
+
+    def __init__(self, api_key=None, routes=(), hedge=True,
+                 hedge_percentile=0.95, min_hedge_delay=0.05,
+                 max_failures=3, max_error_rate=0.5, cooldown=30.0,
+                 explore=0.05, retryable_codes=(503,), seed=None,
+                 **backend_options):
+        """
+        Constructor for RouterHelper - Builds a helper per route, a dict
+        with its 'backend' name, an optional 'name' and its own options
+        (api_key defaults to the router one, other backend_options are
+        shared). Requests go to the healthy route with the lowest latency
+        EWMA; with hedge, a duplicate goes to the next one when no answer
+        came within the route's hedge_percentile latency. A route is left
+        alone for cooldown seconds after max_failures failures in a row or
+        an error rate above max_error_rate. Unmeasured routes are tried
+        first, and an explore share of requests keeps measuring others.
+        >>> helper = RouterHelper(routes=[
+        ...     {"backend": "offline", "name": "slow", "latency": 0.05},
+        ...     {"backend": "offline", "name": "fast"}], explore=0, seed=0)
+        >>> for _ in range(3):
+        ...     translation = helper.translate("Hello", "en", "de")
+        >>> translation
+        ('[en-de] Hello', 'en-de')
+        >>> helper.ranked()[0].name
+        'fast'
+        >>> helper.shutdown()
+        """
+        if not routes:
+            raise ValueError("The router backend needs at least one route")
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_failures = max_failures
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.explore = explore
+        self.retryable_codes = frozenset(retryable_codes)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.routes = []
+        for index, route in enumerate(routes):
+            options = dict(backend_options)
+            options.update(route)
+            backend = options.pop("backend")
+            name = options.pop("name", None) or backend
+            if any(existing.name == name for existing in self.routes):
+                name += "_" + str(index)
+            helper_class = load_backend(backend)
+            self.routes.append(Route(name, helper_class(
+                options.pop("api_key", api_key), **options)))
+        self.max_text_length = min(route.helper.max_text_length
+                                   for route in self.routes)
+        # Two requests (one hedged) per pooled connection at most
+        self.executor = ThreadPoolExecutor(
+            max_workers=2 * backend_options.get("pool_size", 4))
+        self.requests = self.hedged = self.failovers = 0
+
+    @property
+    def catalog(self):
+        return find_catalog(self.routes[0].helper)
+
+    def load_catalog(self, cache_path, ttl=None):
+        """Loads each route catalog, cached next to cache_path"""
+        root, extension = os.path.splitext(cache_path)
+        for index, route in enumerate(self.routes):
+            route.helper.load_catalog(
+                "{0}.{1}{2}".format(root, index, extension), ttl)
+
+    def ranked(self):
+        """Returns routes, healthy ones first, each group by latency score"""
+        now = time.monotonic()
+        with self.lock:
+            healthy = sorted((route for route in self.routes
+                              if route.stats.down_until <= now),
+                             key=lambda route: route.stats.score())
+            down = sorted((route for route in self.routes
+                           if route.stats.down_until > now),
+                          key=lambda route: route.stats.down_until)
+            if len(healthy) > 1 and self.random.random() < self.explore:
+                explored = healthy.pop(self.random.randrange(1, len(healthy)))
+                healthy.insert(0, explored)
+        return healthy + down
+
+    def hedge_delay(self, route):
+        """
+        Seconds to wait for route before sending a hedged duplicate, None
+        (no hedging) until 20 of its latencies are known
+        """
+        with self.lock:
+            delay = route.stats.percentile(self.hedge_percentile)
+        return max(delay or 0.0, self.min_hedge_delay) \
+            if len(route.stats.samples) >= 20 else None
+
+    def _started(self, route, hedged=False):
+        with self.lock:
+            route.stats.requests += 1
+            if hedged:
+                route.stats.hedges += 1
+                self.hedged += 1
+        instrument.count("babelpy_router_requests_total", route=route.name,
+                         hedged=str(hedged).lower())
+
+    def _finished(self, route, started, exception=None):
+        """Records the outcome of a request, returns True if it counts"""
+        with self.lock:
+            if exception is None:
+                route.stats.record_success(time.monotonic() - started)
+            elif is_retryable(exception, self.retryable_codes):
+                route.stats.record_failure(self.max_failures,
+                                           self.max_error_rate, self.cooldown)
+            else:
+                return False  # e.g. unsupported language, not its health
+        return True
+
+    def _attempt(self, route, method, args):
+        started = time.monotonic()
+        try:
+            result = getattr(route.helper, method)(*args)
+        except (TranslateExceptionABC, OSError) as exception:
+            self._finished(route, started, exception)
+            raise
+        self._finished(route, started)
+        return result
+
+    def _won(self, route, hedged):
+        if hedged:
+            with self.lock:
+                route.stats.wins += 1
+
+    def call(self, method, *args):
+        """
+        Calls method of the best route, hedging and failing over to the
+        next ones. Losing duplicates are cancelled when not yet running,
+        else left to finish in the background, their latency recorded.
+        """
+        ranked = self.ranked()
+        with self.lock:
+            self.requests += 1
+        self._started(ranked[0])
+        attempts = {self.executor.submit(self._attempt, ranked[0], method,
+                                         args): ranked[0]}
+        delay = self.hedge_delay(ranked[0])
+        if self.hedge and len(ranked) > 1 and delay is not None and \
+                not wait(attempts, timeout=delay).done:
+            self._started(ranked[1], hedged=True)
+            attempts[self.executor.submit(self._attempt, ranked[1], method,
+                                          args)] = ranked[1]
+        hedged = len(attempts) > 1
+        spare = iter(ranked[len(attempts):])
+        pending, error = set(attempts), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                try:
+                    result = attempt.result()
+                except (TranslateExceptionABC, OSError) as exception:
+                    if not is_retryable(exception, self.retryable_codes):
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    error = exception
+                    continue
+                for other in pending:
+                    other.cancel()
+                self._won(attempts[attempt], hedged)
+                return result
+            failover = next(spare, None) if not pending else None
+            if failover is not None:
+                with self.lock:
+                    self.failovers += 1
+                self._started(failover)
+                attempt = self.executor.submit(self._attempt, failover,
+                                               method, args)
+                attempts[attempt] = failover
+                pending.add(attempt)
+        raise error
+
+    async def _aattempt(self, route, method, args):
+        started = time.monotonic()
+        try:
+            result = await getattr(route.helper, method)(*args)
+        except (TranslateExceptionABC, OSError) as exception:
+            self._finished(route, started, exception)
+            raise
+        self._finished(route, started)
+        return result
+
+    async def acall(self, method, *args):
+        """Coroutine counterpart of call(), really cancelling the loser"""
+        import asyncio  # Here, as it is slow to import and CLI runs skip it
+
+        ranked = self.ranked()
+        with self.lock:
+            self.requests += 1
+        self._started(ranked[0])
+        attempts = {asyncio.ensure_future(
+            self._aattempt(ranked[0], method, args)): ranked[0]}
+        delay = self.hedge_delay(ranked[0])
+        if self.hedge and len(ranked) > 1 and delay is not None and \
+                not (await asyncio.wait(attempts, timeout=delay))[0]:
+            self._started(ranked[1], hedged=True)
+            attempts[asyncio.ensure_future(
+                self._aattempt(ranked[1], method, args))] = ranked[1]
+        hedged = len(attempts) > 1
+        spare = iter(ranked[len(attempts):])
+        pending, error = set(attempts), None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    try:
+                        result = attempt.result()
+                    except (TranslateExceptionABC, OSError) as exception:
+                        if not is_retryable(exception, self.retryable_codes):
+                            raise
+                        error = exception
+                        continue
+                    self._won(attempts[attempt], hedged)
+                    return result
+                failover = next(spare, None) if not pending else None
+                if failover is not None:
+                    with self.lock:
+                        self.failovers += 1
+                    self._started(failover)
+                    attempt = asyncio.ensure_future(
+                        self._aattempt(failover, method, args))
+                    attempts[attempt] = failover
+                    pending.add(attempt)
+            raise error
+        finally:
+            for other in pending:
+                other.cancel()
+
+    def detect(self, target_text):
+        return self.call("detect", target_text)
+
+    def translate(self, target_text, source_lang, target_lang):
+        return self.call("translate", target_text, source_lang, target_lang)
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        return self.call("translate_batch", target_texts, source_lang,
+                         target_lang)
+
+    async def adetect(self, target_text):
+        return await self.acall("adetect", target_text)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        return await self.acall("atranslate", target_text, source_lang,
+                                target_lang)
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        return await self.acall("atranslate_batch", target_texts,
+                                source_lang, target_lang)
+
+    def stats(self):
+        """
+        Returns dict with hedge/failover counts and, per route, requests,
+        errors, hedges won, latency EWMA and p50/p95/p99 in milliseconds
+        """
+        now = time.monotonic()
+        with self.lock:
+            stats = {"requests": self.requests, "hedged": self.hedged,
+                     "hedge_rate": self.hedged / self.requests
+                     if self.requests else 0.0,
+                     "failovers": self.failovers}
+            for route in self.routes:
+                prefix = "route_" + re.sub(r"\W", "_", route.name) + "_"
+                route_stats = route.stats
+                stats[prefix + "requests"] = route_stats.requests
+                stats[prefix + "errors"] = route_stats.errors
+                stats[prefix + "hedges"] = route_stats.hedges
+                stats[prefix + "hedge_wins"] = route_stats.wins
+                stats[prefix + "healthy"] = int(route_stats.down_until <= now)
+                stats[prefix + "ewma_ms"] = None if route_stats.ewma is None \
+                    else round(route_stats.ewma * 1000, 3)
+                for share in (0.5, 0.95, 0.99):
+                    value = route_stats.percentile(share)
+                    stats[prefix + "p{0}_ms".format(int(share * 100))] = \
+                        None if value is None else round(value * 1000, 3)
+        return stats
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
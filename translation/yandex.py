@@ -1,6 +1,10 @@
+import json
+
 import requests
 
+from translation import instrument
 from translation.abc_translate import TranslateExceptionABC, TranslateHelperABC
+from translation.catalog import LanguageCatalog
 
 
 class YandexTranslatorException(TranslateExceptionABC):
@@ -19,6 +23,7 @@ class YandexTranslatorException(TranslateExceptionABC):
     }
 
     def __init__(self, status_code):
+        self.status_code = status_code
         self.msg = self.error_codes.get(status_code)
 
     def __str__(self): return self.msg
@@ -32,16 +37,37 @@ class YandexTranslator(object):
         "detect": "detect",
         "translate": "translate",
     }
+    max_text_length = 10000  # Characters per request (ERR_TEXT_TOO_LONG)
+    default_timeout = (3.05, 15)  # Seconds to connect, seconds to read
+    network_errors = (requests.exceptions.ConnectionError,
+                      requests.exceptions.Timeout)
 
-    def __init__(self, key=None):
+    def __init__(self, key=None, api_url=None, pool_size=10, timeout=None,
+                 proxies=None, limiter=None):
         """
+        Sets up a pooled keep-alive session (pool_size connections per host)
+        and an optional client-side RateLimiter applied to detect/translate
         >>> translate = YandexTranslator("API key here")
         >>> len(translate.api_endpoints)
         3
+        >>> translate = YandexTranslator("Key", "http://127.0.0.1/{endpoint}")
+        >>> translate.url("detect")
+        'http://127.0.0.1/detect'
         """
         if not key:
             raise YandexTranslatorException(401)
         self.api_key = key
+        if api_url:
+            self.api_url = api_url
+        self.timeout = timeout or self.default_timeout
+        self.proxies = proxies
+        self.limiter = limiter
+        self._directions = None
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def url(self, endpoint):
         """
@@ -60,25 +86,32 @@ class YandexTranslator(object):
     @property
     def directions(self, proxies=None):
         """
-        Returns list with translate directions
+        Returns list with translate directions (fetched once per instance)
         >>> translate = YandexTranslator("API key here")
         >>> directions = translate.directions
         >>> len(directions) > 0
         True
         """
+        if self._directions is not None:
+            return self._directions
+        instrument.count("babelpy_requests_total", backend="yandex",
+                         endpoint="langs")
         try:
-            response = requests.get(self.url("langs"),
-                                    params={"key": self.api_key},
-                                    proxies=proxies)
-        except requests.exceptions.ConnectionError:
-            error_code = YandexTranslatorException.error_codes[503]
-            raise YandexTranslatorException(error_code)
+            with instrument.span("yandex.http", endpoint="langs"):
+                response = self.session.get(self.url("langs"),
+                                            params={"key": self.api_key},
+                                            proxies=proxies or self.proxies,
+                                            timeout=self.timeout)
+        except self.network_errors:
+            raise YandexTranslatorException(503)
         else:
-            response = response.json()
+            with instrument.span("yandex.json"):
+                response = response.json()
         status_code = response.get("code", 200)
         if status_code != 200:
             raise YandexTranslatorException(status_code)
-        return response.get("dirs")
+        self._directions = response.get("dirs")
+        return self._directions
 
     @property
     def langs(self):
@@ -104,17 +137,23 @@ class YandexTranslator(object):
             "format": text_format,
             "key": self.api_key,
         }
+        if self.limiter:
+            self.limiter.acquire(len(text))
+        instrument.count("babelpy_requests_total", backend="yandex",
+                         endpoint="detect")
+        instrument.count("babelpy_chars_total", len(text), backend="yandex")
         try:
-            response = requests.post(self.url("detect"), data=data,
-                                     proxies=proxies)
-        except ConnectionError:
-            error_code = YandexTranslatorException.error_codes[503]
-            raise YandexTranslatorException(error_code)
+            with instrument.span("yandex.http", endpoint="detect"):
+                response = self.session.post(self.url("detect"), data=data,
+                                             proxies=proxies or self.proxies,
+                                             timeout=self.timeout)
+        except self.network_errors:
+            raise YandexTranslatorException(503)
         except ValueError:
-            error_code = YandexTranslatorException.error_codes[422]
-            raise YandexTranslatorException(error_code)
+            raise YandexTranslatorException(422)
         else:
-            response = response.json()
+            with instrument.span("yandex.json"):
+                response = response.json()
         language = response.get("lang", None)
         status_code = response.get("code", 200)
         if status_code != 200:
@@ -124,25 +163,126 @@ class YandexTranslator(object):
         return language
 
     def translate(self, text, lang, proxies=None, text_format="plain"):
-        """Translates text to given language"""
+        """Translates text (or list of texts) to given language"""
         data = {
             "text": text,
             "format": text_format,
             "lang": lang,
             "key": self.api_key
         }
+        chars = len(text) if isinstance(text, str) \
+            else sum(len(part) for part in text)
+        if self.limiter:
+            self.limiter.acquire(chars)
+        instrument.count("babelpy_requests_total", backend="yandex",
+                         endpoint="translate")
+        instrument.count("babelpy_chars_total", chars, backend="yandex")
         try:
-            response = requests.post(self.url("translate"), data=data,
-                                     proxies=proxies)
-        except ConnectionError:
+            with instrument.span("yandex.http", endpoint="translate"):
+                response = self.session.post(self.url("translate"), data=data,
+                                             proxies=proxies or self.proxies,
+                                             timeout=self.timeout)
+        except self.network_errors:
             raise YandexTranslatorException(503)
         else:
-            response = response.json()
+            with instrument.span("yandex.json"):
+                response = response.json()
+        status_code = response.get("code", 200)
+        if status_code != 200:
+            raise YandexTranslatorException(status_code)
+        return response
+
+
+class AsyncYandexTranslator(object):
+    """AsyncYandexTranslator - YandexTranslator counterpart for asyncio"""
+
+    api_url = YandexTranslator.api_url
+    url = YandexTranslator.url
+
+    def __init__(self, key=None, api_url=None, pool_size=10, timeout=None,
+                 proxies=None, limiter=None):
+        """
+        Sets up a keep-alive connection pool (pool_size connections) on the
+        event loop running the first request. timeout (Default: connect and
+        read timeouts of YandexTranslator added up) bounds each request.
+        proxies is a requests style {scheme: proxy URL} dict.
+        >>> translate = AsyncYandexTranslator("Key", "http://h/{endpoint}")
+        >>> translate.url("translate")
+        'http://h/translate'
+        """
+        from translation.aio import AsyncConnectionPool
+
+        if not key:
+            raise YandexTranslatorException(401)
+        self.api_key = key
+        if api_url:
+            self.api_url = api_url
+        self.api_version = YandexTranslator.api_version
+        self.api_endpoints = YandexTranslator.api_endpoints
+        self.timeout = timeout or sum(YandexTranslator.default_timeout)
+        self.limiter = limiter
+        self._directions = None
+        self.pool = AsyncConnectionPool(pool_size, proxies)
+
+    async def _request(self, endpoint, fields, chars=0, method="POST"):
+        """Sends one API request, returns its decoded JSON response"""
+        import asyncio  # Only asyncio users pay for importing it
+
+        if self.limiter:
+            # File locked token bucket, kept off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.limiter.acquire, chars)
+        instrument.count("babelpy_requests_total", backend="yandex",
+                         endpoint=endpoint)
+        if chars:
+            instrument.count("babelpy_chars_total", chars, backend="yandex")
+        fields["key"] = self.api_key
+        try:
+            with instrument.span("yandex.http", endpoint=endpoint):
+                _, body = await asyncio.wait_for(
+                    self.pool.request(method, self.url(endpoint), fields),
+                    self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            raise YandexTranslatorException(503)
+        try:
+            with instrument.span("yandex.json"):
+                response = json.loads(body.decode("utf-8"))
+        except ValueError:
+            raise YandexTranslatorException(503)
         status_code = response.get("code", 200)
         if status_code != 200:
             raise YandexTranslatorException(status_code)
         return response
 
+    async def directions(self):
+        """Returns list with translate directions (fetched once)"""
+        if self._directions is None:
+            response = await self._request("langs", {}, method="GET")
+            self._directions = response.get("dirs")
+        return self._directions
+
+    async def detect(self, text, text_format="plain"):
+        """Specifies language of text"""
+        response = await self._request("detect", {"text": text,
+                                                  "format": text_format},
+                                       len(text))
+        language = response.get("lang", None)
+        if not language:
+            raise YandexTranslatorException(501)
+        return language
+
+    async def translate(self, text, lang, text_format="plain"):
+        """Translates text (or list of texts) to given language"""
+        chars = len(text) if isinstance(text, str) \
+            else sum(len(part) for part in text)
+        return await self._request("translate", {"text": text,
+                                                 "format": text_format,
+                                                 "lang": lang}, chars)
+
+    def close(self):
+        """Closes pooled (idle) connections"""
+        self.pool.close()
+
 
 class YandexHelperException(TranslateExceptionABC):
     """
@@ -155,6 +295,7 @@ class YandexHelperException(TranslateExceptionABC):
     }
 
     def __init__(self, status_code, lang_info):
+        self.status_code = status_code
         self.msg = self.error_codes.get(status_code) + " -> " + lang_info
 
     def __str__(self): return self.msg
@@ -163,9 +304,16 @@ class YandexHelperException(TranslateExceptionABC):
 class YandexHelper(TranslateHelperABC):
     """YandexHelper - Handles Yandex Translation API requests"""
 
-    def __init__(self, api_key):
+    max_text_length = YandexTranslator.max_text_length
+
+    def __init__(self, api_key, catalog=None, detector=None,
+                 detection_threshold=0.95, **translator_options):
         """Constructor for YandexHelper - Setup object with API key"""
-        self.yandex_translate = YandexTranslator(api_key)
+        self.yandex_translate = YandexTranslator(api_key, **translator_options)
+        self.translator_options = translator_options
+        self._async_translate = None
+        self.detector = detector
+        self.detection_threshold = detection_threshold
         self.available_languages = ['no', 'sv', 'sr', 'ro', 'mk', 'fi', 'ru',
                                     'cs', 'hu', 'hr', 'sl', 'sq', 'be', 'es',
                                     'tr', 'it', 'el', 'bg', 'pt', 'pl', 'uk',
@@ -211,13 +359,166 @@ class YandexHelper(TranslateHelperABC):
                                        'uk-bg', 'uk-cs', 'uk-de', 'uk-en',
                                        'uk-es', 'uk-fr', 'uk-it', 'uk-pl',
                                        'uk-ro', 'uk-ru', 'uk-sr', 'uk-tr']
+        self.catalog = catalog or LanguageCatalog(self.available_translations)
 
-    def translate(self, target_text, source_lang, target_lang):
+    def load_catalog(self, cache_path, ttl=None):
+        """Loads directions persisted at cache_path, refreshing when stale"""
+        self.catalog = LanguageCatalog.load(
+            cache_path, lambda: self.yandex_translate.directions, ttl,
+            self.available_translations)
+
+    @property
+    def local_detector(self):
+        """Offline detector, built on first use for the available languages"""
+        if self.detector is None:
+            from translation.detect import NgramDetector
+
+            self.detector = NgramDetector(languages=self.available_languages)
+        return self.detector
+
+    def detect(self, target_text):
+        """Detects language offline, asking the API only when unsure"""
+        language, confidence = self.local_detector.detect(target_text)
+        if language and confidence >= self.detection_threshold:
+            return language
+        return self.yandex_translate.detect(target_text)
+
+    def detect_batch(self, target_texts):
+        detected = self.local_detector.detect_batch(target_texts)
+        return [language if language and
+                confidence >= self.detection_threshold
+                else self.yandex_translate.detect(target_text)
+                for target_text, (language, confidence)
+                in zip(target_texts, detected)]
+
+    @property
+    def async_translate(self):
+        """AsyncYandexTranslator, created on first use"""
+        if self._async_translate is None:
+            self._async_translate = AsyncYandexTranslator(
+                self.yandex_translate.api_key, **self.translator_options)
+        return self._async_translate
+
+    async def adetect(self, target_text):
+        """Detects language offline, awaiting the API only when unsure"""
+        language, confidence = self.local_detector.detect(target_text)
+        if language and confidence >= self.detection_threshold:
+            return language
+        return await self.async_translate.detect(target_text)
+
+    def check_direction(self, source_lang, target_lang):
+        """Raises YandexHelperException(505) for unsupported directions"""
         if source_lang == "auto":
-            translate_direction = target_lang
+            supported = self.catalog.supports_target(target_lang)
         else:
-            translate_direction = source_lang + "-" + target_lang
+            supported = self.catalog.supports(source_lang, target_lang)
+        if not supported:
+            raise YandexHelperException(
+                505, self._direction(source_lang, target_lang))
+
+    @staticmethod
+    def _direction(source_lang, target_lang):
+        if source_lang == "auto":
+            return target_lang
+        return source_lang + "-" + target_lang
+
+    def translate(self, target_text, source_lang, target_lang):
+        self.check_direction(source_lang, target_lang)
+        translate_direction = self._direction(source_lang, target_lang)
         response = self.yandex_translate.translate(target_text,
                                                    translate_direction)
         return response['text'][0], response['lang']
-        pass
+
+    def _split(self, target_texts):
+        """
+        Returns texts with the ones longer than max_text_length cut on
+        line/sentence breaks (trailing spaces kept aside, as the API trims
+        them), and the layout of each text: (translated, trailing spaces)
+        per piece, untranslated pieces being only spaces
+        >>> helper = YandexHelper("Key")
+        >>> helper.max_text_length = 12
+        >>> pieces, layouts = helper._split(["Short", "First one.\\nEnd\\n"])
+        >>> pieces, layouts[1]
+        (['Short', 'First one.', 'End'], [(True, '\\n'), (True, '\\n')])
+        """
+        pieces, layouts = [], []
+        for target_text in target_texts:
+            if len(target_text) <= self.max_text_length:
+                pieces.append(target_text)
+                layouts.append([(True, "")])
+                continue
+            import io
+
+            from utils.stream import read_chunks
+
+            layout = []
+            for chunk in read_chunks(io.StringIO(target_text),
+                                     self.max_text_length):
+                stripped = chunk.rstrip()
+                if stripped:
+                    pieces.append(stripped)
+                    layout.append((True, chunk[len(stripped):]))
+                else:
+                    layout.append((False, chunk))
+            layouts.append(layout)
+        return pieces, layouts
+
+    @staticmethod
+    def _join(results, layouts):
+        """Returns (translation, direction) of each text split by _split"""
+        joined, position = [], 0
+        for layout in layouts:
+            translation, direction = [], None
+            for translated, trailing in layout:
+                if translated:
+                    translation.append(results[position][0])
+                    direction = results[position][1]
+                    position += 1
+                translation.append(trailing)
+            joined.append(("".join(translation), direction))
+        return joined
+
+    def _pack(self, target_texts):
+        """Yields lists of texts, each fitting in a single API request"""
+        max_length = self.max_text_length
+        packed, packed_length = [], 0
+        for target_text in target_texts:
+            if packed and packed_length + len(target_text) > max_length:
+                yield packed
+                packed, packed_length = [], 0
+            packed.append(target_text)
+            packed_length += len(target_text)
+        if packed:
+            yield packed
+
+    def translate_batch(self, target_texts, source_lang, target_lang):
+        self.check_direction(source_lang, target_lang)
+        translate_direction = self._direction(source_lang, target_lang)
+        pieces, layouts = self._split(target_texts)
+        results = []
+        for packed in self._pack(pieces):
+            response = self.yandex_translate.translate(packed,
+                                                       translate_direction)
+            results.extend((translation, response['lang'])
+                           for translation in response['text'])
+        return self._join(results, layouts)
+
+    async def atranslate(self, target_text, source_lang, target_lang):
+        self.check_direction(source_lang, target_lang)
+        response = await self.async_translate.translate(
+            target_text, self._direction(source_lang, target_lang))
+        return response['text'][0], response['lang']
+
+    async def atranslate_batch(self, target_texts, source_lang, target_lang):
+        """Sends the packed requests of a batch concurrently"""
+        import asyncio
+
+        self.check_direction(source_lang, target_lang)
+        translate_direction = self._direction(source_lang, target_lang)
+        pieces, layouts = self._split(target_texts)
+        responses = await asyncio.gather(*(
+            self.async_translate.translate(packed, translate_direction)
+            for packed in self._pack(pieces)))
+        return self._join([(translation, response['lang'])
+                           for response in responses
+                           for translation in response['text']], layouts)
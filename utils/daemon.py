@@ -0,0 +1,87 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+
+from translation import instrument
+from translation.abc_translate import TranslateExceptionABC
+
+
+def default_socket_path():
+    """Returns per-user UNIX socket path used by daemon and client modes"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir())
+    return os.path.join(runtime_dir, "babelPy-{0}.sock".format(os.getuid()))
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one JSON line request, replies with one JSON line"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            reply = self.server.handle_request_data(request)
+        except ValueError as exception:
+            reply = {"error": "ERR_BAD_REQUEST -> {0}".format(exception)}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class TranslateDaemon(socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+    """TranslateDaemon - Serves translations from a warm process"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, translator, on_translation=None):
+        """
+        Constructor for TranslateDaemon - Binds to given UNIX socket path
+        on_translation(request, translation, direction) is called after each
+        successful translation (e.g. to show a notification)
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        # Created owner-only, rather than chmod()ed after a wider umask
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+        self.socket_path = socket_path
+        self.translator = translator
+        self.on_translation = on_translation
+
+    def handle_request_data(self, request):
+        try:
+            with instrument.span("daemon.translate"):
+                translation, direction = self.translator.translate(
+                    request["text"], request.get("source", "auto"),
+                    request["target"])
+        except TranslateExceptionABC as translate_error:
+            return {"error": translate_error.msg}
+        except Exception as exception:
+            return {"error": "{0}: {1}".format(type(exception).__name__,
+                                               exception)}
+        if self.on_translation:
+            self.on_translation(request, translation, direction)
+        return {"translation": translation, "direction": direction}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def request_translation(socket_path, text, source_lang, target_lang,
+                        output=None, timeout=None):
+    """
+    Forwards a translation request to a running daemon, returns reply dict
+    Raises socket.error (OSError) if no daemon listens on socket_path
+    """
+    request = {"text": text, "source": source_lang, "target": target_lang,
+               "output": output}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reply_stream:
+            return json.loads(reply_stream.readline().decode("utf-8"))
@@ -0,0 +1,98 @@
+import tkinter
+
+
+class TkDialogNotifier(tkinter.Frame):
+    """TkDialogNotifier - TkDialog showing translation"""
+
+    copied_feedback_ms = 3000
+    _instance = None  # Dialog reused by every show_dialog() call
+
+    def __init__(self, master=None, keep_alive=False):
+        """
+        Constructor for TkDialogNotifier - With keep_alive, QUIT only hides
+        the window so the next translation can reuse it
+        """
+        super().__init__(master)
+        self.root_tk = master
+        self.keep_alive = keep_alive
+        self.reset_job = None
+        self.pack()
+        self._setup_widgets()
+
+    def _setup_widgets(self):
+        self.text_box_source = tkinter.Text(self, width=40, height=5)
+        self.text_box_translated = tkinter.Text(self, width=40, height=5)
+        self.quit_button = tkinter.Button(self, text="QUIT", fg="red",
+                                          command=self.close)
+        self.quit_button.pack(side="bottom")
+        self.action_button = tkinter.Button(self)
+        self.action_button["text"] = "Copy to clipboard"
+        self.action_button["command"] = self.action_button_callback
+        self.action_button.pack(side="bottom")
+        self.text_box_source.pack(side="left")
+        self.text_box_translated.pack(side="left")
+
+    def is_alive(self):
+        try:
+            return bool(self.winfo_exists())
+        except tkinter.TclError:  # Its Tk root was destroyed
+            return False
+
+    def close(self):
+        if self.keep_alive:
+            self.root_tk.withdraw()
+        else:
+            self.root_tk.destroy()
+
+    def action_button_callback(self):
+        from utils.clipboard import push_clipboard
+        push_clipboard(self.text_box_translated.get("1.0", tkinter.END))
+        self.action_button["text"] = "Copied to clipboard!"
+        # Reset later from the event loop instead of blocking it
+        if self.reset_job:
+            self.after_cancel(self.reset_job)
+        self.reset_job = self.after(self.copied_feedback_ms,
+                                    self.set_action_button_text,
+                                    "Copy to clipboard")
+
+    @staticmethod
+    def _replace_text(text_box, message):
+        text_box.config(state=tkinter.NORMAL)
+        text_box.delete("1.0", tkinter.END)
+        text_box.insert(tkinter.INSERT, message)
+        text_box.config(state=tkinter.DISABLED)
+
+    def set_source_text(self, message):
+        self._replace_text(self.text_box_source, message)
+
+    def set_translated_text(self, message):
+        self._replace_text(self.text_box_translated, message)
+
+    def set_action_button_text(self, button_text):
+        self.reset_job = None
+        self.action_button["text"] = button_text
+
+    @classmethod
+    def show_dialog(cls, app_id, src_message, translation, target_language,
+                    root_tk=None):
+        """
+        Shows translation, reusing the dialog window when it still exists
+        Given a root_tk whose event loop is already running (long-lived
+        processes), the dialog is a Toplevel of it and this returns at once;
+        otherwise the dialog owns its Tk root and blocks until closed.
+        """
+        tk_dialog = cls._instance
+        if tk_dialog is None or not tk_dialog.is_alive():
+            window = tkinter.Toplevel(root_tk) if root_tk else tkinter.Tk()
+            window.minsize(width=100, height=20)
+            window.protocol("WM_DELETE_WINDOW", lambda: cls._instance.close())
+            tk_dialog = cls._instance = cls(master=window,
+                                            keep_alive=root_tk is not None)
+        tk_dialog.root_tk.title(app_id + " - Translated to: " +
+                                target_language)
+        tk_dialog.set_source_text(src_message)
+        tk_dialog.set_translated_text(translation)
+        tk_dialog.root_tk.deiconify()
+        tk_dialog.root_tk.lift()
+        if not tk_dialog.keep_alive:
+            tk_dialog.mainloop()
@@ -1,11 +1,13 @@
-import time
-import tkinter
 from abc import ABC, abstractmethod
 
-import gi
 
-gi.require_version('Notify', '0.7')
-from gi.repository import Notify
+def _load_notify():
+    """Imports libnotify bindings on first use (gi is slow to import)"""
+    import gi
+
+    gi.require_version('Notify', '0.7')
+    from gi.repository import Notify
+    return Notify
 
 
 class TranslateNotifier(ABC):
@@ -22,77 +24,43 @@ class TranslateNotifier(ABC):
         pass
 
 
-class TkDialogNotifier(tkinter.Frame):
-    """TkDialogNotifier - TkDialog showing translation"""
-
-    def __init__(self, master=None):
-        super().__init__(master)
-        self.root_tk = master
-        self.pack()
-        self._setup_widgets()
-
-    def _setup_widgets(self):
-        self.text_box_source = tkinter.Text(self, width=40, height=5)
-        self.text_box_translated = tkinter.Text(self, width=40, height=5)
-        self.quit_button = tkinter.Button(self, text="QUIT", fg="red",
-                                          command=self.root_tk.destroy)
-        self.quit_button.pack(side="bottom")
-        self.action_button = tkinter.Button(self)
-        self.action_button["text"] = "Copy to clipboard"
-        self.action_button["command"] = self.action_button_callback
-        self.action_button.pack(side="bottom")
-
-    def action_button_callback(self):
-        from utils.clipboard import push_clipboard
-        push_clipboard(self.text_box_translated.get("1.0", tkinter.END))
-        self.action_button["text"] = "Copied to clipboard!"
-        time.sleep(3)
-        self.action_button["text"] = "Copy to clipboard"
-
-    def set_source_text(self, message):
-        self.text_box_source.insert(tkinter.INSERT, message)
-        self.text_box_source.pack(side="left")
-        self.text_box_source.config(state=tkinter.DISABLED)
-
-    def set_translated_text(self, message):
-        self.text_box_translated.insert(tkinter.INSERT, message)
-        self.text_box_translated.pack(side="left")
-        self.text_box_translated.config(state=tkinter.DISABLED)
-
-    def set_action_button_text(self, button_text):
-        self.action_button["text"] = button_text
-
-    @staticmethod
-    def show_dialog(app_id, src_message, translation, target_language):
-        root_tk = tkinter.Tk()
-        root_tk.title(app_id + " - Translated to: " + target_language)
-        root_tk.minsize(width=100, height=20)
-        tk_dialog = TkDialogNotifier(master=root_tk)
-        tk_dialog.set_source_text(src_message)
-        tk_dialog.set_translated_text(translation)
-        tk_dialog.mainloop()
-
-
 class LinuxNotifier(TranslateNotifier):
     """LinuxNotifier class handles linux notifications"""
 
     def __init__(self, app_id, icon_path):
-        """Constructor for LinuxNotifier"""
+        """Constructor for LinuxNotifier - Initializes libnotify once"""
         super().__init__(app_id, icon_path)
-        Notify.init(app_id)
+        self.notify_lib = _load_notify()
+        if not self.notify_lib.is_initted():
+            self.notify_lib.init(app_id)
         self.icon_path = icon_path
+        self.notification = None
 
     def notify(self, message, title):
-        Notify.Notification.new(title, message, self.icon_path).show()
-        Notify.uninit()
+        """Shows message, updating the previous notification in place"""
+        if self.notification is None:
+            self.notification = self.notify_lib.Notification.new(
+                title, message, self.icon_path)
+        else:
+            self.notification.update(title, message, self.icon_path)
+        self.notification.show()
+
+    def close(self):
+        self.notification = None
+        self.notify_lib.uninit()
 
 
 class NotifyHelper(TranslateNotifier):
     """NotifyHelper class that helps handling notifications between systems"""
 
+    _notifiers = {}  # (app_id, icon_path) -> notifier, reused per process
+
     def __init__(self, app_id, icon_path):
         """Constructor for NotifyHelper"""
         super().__init__(app_id, icon_path)
 
     def notify(self, message, title):
-        LinuxNotifier(self.app_id, self.icon_path).notify(message, title)
+        key = self.app_id, self.icon_path
+        if key not in self._notifiers:
+            self._notifiers[key] = LinuxNotifier(self.app_id, self.icon_path)
+        self._notifiers[key].notify(message, title)
@@ -24,7 +24,13 @@ class ConfigSettings:
                     'api_key']
                 self.google_api_key = loaded_data['backend']['google'][
                     'api_key']
-                self.api_key = loaded_data['backend'][self.backend]['api_key']
+                self.api_key = loaded_data['backend'].get(
+                    self.backend, {}).get('api_key', "")
+                self.backends = loaded_data['backend']
+                self.cache = loaded_data.get('cache', {})
+                self.rate_limit = loaded_data.get('rate_limit', {})
+                self.memory = loaded_data.get('memory', {})
+                self.glossary = loaded_data.get('glossary', {})
         except FileNotFoundError:
             print("[Warning] No config file found, creating empty settings...")
             self.backend = "yandex"
@@ -38,6 +44,17 @@ class ConfigSettings:
             self.yandex_api_key = ""
             self.microsoft_api_key = ""
             self.google_api_key = ""
+            self.backends = {}
+            self.cache = {}
+            self.rate_limit = {}
+            self.memory = {}
+            self.glossary = {}
+
+    def backend_options(self, backend):
+        """Returns extra config entries (besides api_key) of given backend"""
+        return {option: value
+                for option, value in self.backends.get(backend, {}).items()
+                if option != 'api_key'}
 
     def save(self, parsed_args):
         """save - Saves config settings to given file"""
@@ -72,20 +89,26 @@ class ConfigSettings:
             self.output = parsed_args.output
         if parsed_args.exchange:
             self.exchange = parsed_args.exchange
+        backends = {name: dict(options)
+                    for name, options in self.backends.items()}
+        backends.setdefault("yandex", {})["api_key"] = self.yandex_api_key
+        backends.setdefault("microsoft", {})["api_key"] = \
+            self.microsoft_api_key
+        backends.setdefault("google", {})["api_key"] = self.google_api_key
         try:
             with open(self.config_path, 'w') as config_file:
                 json.dump(
                     {"babelPY": "Config settings file for babelPy",
                      "default_backend": self.backend,
-                     "backend": {
-                         "yandex": {"api_key": self.yandex_api_key},
-                         "microsoft": {"api_key": self.microsoft_api_key},
-                         "google": {"api_key": self.google_api_key}
-                     },
+                     "backend": backends,
                      "default_language": self.language,
                      "default_input": self.input,
                      "default_output": self.output,
-                     "default_exchange": self.exchange},
+                     "default_exchange": self.exchange,
+                     "cache": self.cache,
+                     "rate_limit": self.rate_limit,
+                     "memory": self.memory,
+                     "glossary": self.glossary},
                     config_file)
                 print("Settings successfully saved at: " + config_file.name)
                 return 0  # Status code to return to sys.exit()
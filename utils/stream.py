@@ -0,0 +1,77 @@
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_sentence_end = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_long_line(line, max_length):
+    """Yields pieces of line no longer than max_length, cut on sentences"""
+    body = line.rstrip("\n")
+    piece = ""
+    for sentence in _sentence_end.split(body):
+        while len(sentence) > max_length:
+            if piece:
+                yield piece + " "
+                piece = ""
+            yield sentence[:max_length]
+            sentence = sentence[max_length:]
+        if piece and len(piece) + len(sentence) + 1 > max_length:
+            yield piece + " "
+            piece = ""
+        piece = piece + " " + sentence if piece else sentence
+    yield piece + line[len(body):]
+
+
+def read_chunks(text_stream, max_length):
+    """
+    Lazily yields chunks of whole lines (line breaks kept) from text_stream
+    Each chunk is at most max_length characters long and chunks end on a
+    paragraph break when one is found past half of max_length.
+    >>> import io
+    >>> list(read_chunks(io.StringIO("one\\ntwo\\n\\nthree\\n"), 9))
+    ['one\\ntwo\\n\\n', 'three\\n']
+    """
+    chunk, chunk_length = [], 0
+    for line in text_stream:
+        if len(line) > max_length:
+            if chunk:
+                yield "".join(chunk)
+                chunk, chunk_length = [], 0
+            yield from _split_long_line(line, max_length - 1)
+            continue
+        if chunk_length + len(line) > max_length:
+            yield "".join(chunk)
+            chunk, chunk_length = [], 0
+        chunk.append(line)
+        chunk_length += len(line)
+        if not line.strip() and chunk_length >= max_length // 2:
+            yield "".join(chunk)
+            chunk, chunk_length = [], 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def _translate_chunk(translator, chunk, source_lang, target_lang):
+    if not chunk.strip():
+        return chunk
+    stripped = chunk.rstrip()
+    translation, _ = translator.translate(stripped, source_lang, target_lang)
+    return translation + chunk[len(stripped):]
+
+
+def translate_stream(translator, chunks, source_lang, target_lang,
+                     max_in_flight=4):
+    """
+    Yields translated chunks in input order, keeping at most max_in_flight
+    requests pending, so memory use does not grow with the input size
+    """
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(_translate_chunk, translator,
+                                           chunk, source_lang, target_lang))
+        while pending:
+            yield pending.popleft().result()
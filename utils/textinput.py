@@ -0,0 +1,25 @@
+import sys
+
+
+def is_text_input(src_input):
+    """
+    Returns True if given input type names a file or stdin
+    >>> is_text_input("file:notes.txt"), is_text_input("-")
+    (True, True)
+    >>> is_text_input("clipboard")
+    False
+    """
+    return src_input == "-" or src_input.startswith("file:")
+
+
+def open_input(src_input):
+    """Returns an open text stream for 'file:PATH' or '-' (stdin)"""
+    if src_input == "-":
+        return sys.stdin
+    return open(src_input[len("file:"):], encoding="utf-8")
+
+
+def pull_lines(src_input):
+    """Returns list of lines (without line breaks) from file or stdin"""
+    with open_input(src_input) as text_stream:
+        return text_stream.read().splitlines()
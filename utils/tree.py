@@ -0,0 +1,388 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from translation.abc_translate import TranslateExceptionABC
+
+_po_keyword = re.compile(r'^(msgctxt|msgid_plural|msgid|msgstr(?:\[\d+\])?)'
+                         r'\s+(".*")\s*$')
+_po_escapes = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+_po_language = re.compile(r'"Language: [^"\\]*\\n"')
+_srt_block_break = re.compile(r"\n[ \t]*\n")
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _po_unquote(quoted):
+    """
+    Returns value of a quoted PO string
+    >>> _po_unquote('"Say \\\\"hi\\\\"\\\\n"')
+    'Say "hi"\\n'
+    """
+    return re.sub(r"\\(.)", lambda match: _po_escapes.get(match.group(1),
+                                                          match.group(0)),
+                  quoted[1:-1])
+
+
+def _po_quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace(
+        "\t", "\\t").replace("\r", "\\r").replace("\n", "\\n") + '"'
+
+
+def _po_lines(keyword, value):
+    """Returns PO lines for keyword, splitting multi-line values"""
+    pieces = value.splitlines(True)
+    if len(pieces) <= 1:
+        return [keyword + " " + _po_quote(value)]
+    return [keyword + ' ""'] + [_po_quote(piece) for piece in pieces]
+
+
+class PoFormat(object):
+    """PoFormat - gettext catalogs, msgstr filled with translations"""
+
+    extensions = (".po", ".pot")
+
+    @staticmethod
+    def target_name(relative_path):
+        root, extension = os.path.splitext(relative_path)
+        return root + ".po" if extension == ".pot" else relative_path
+
+    @staticmethod
+    def parse(text):
+        """
+        Returns (document, [(key, source text)])
+        >>> document, entries = PoFormat.parse(
+        ...     'msgid ""\\nmsgstr "Language: en\\\\n"\\n\\n#: a.c:1\\n'
+        ...     'msgid "Hello"\\nmsgstr ""\\n')
+        >>> entries
+        [('Hello', 'Hello')]
+        >>> print(PoFormat.render(document, {"Hello": "Hallo"}, "de"))
+        msgid ""
+        msgstr "Language: de\\n"
+        <BLANKLINE>
+        #: a.c:1
+        msgid "Hello"
+        msgstr "Hallo"
+        <BLANKLINE>
+        """
+        document, entries = [], []
+        for block in re.split(r"\n[ \t]*\n", text.strip("\n")):
+            head, fields, field = [], {}, None
+            for line in block.splitlines():
+                match = _po_keyword.match(line)
+                if match:
+                    field = match.group(1)
+                    fields[field] = _po_unquote(match.group(2))
+                elif field and line.strip().startswith('"'):
+                    fields[field] += _po_unquote(line.strip())
+                else:
+                    field = None
+                if not field or not field.startswith("msgstr"):
+                    head.append(line)
+            msgid = fields.get("msgid")
+            key = None
+            if msgid:  # The header (empty msgid) is not translated
+                key = fields.get("msgctxt", "") + "\x04" + msgid \
+                    if "msgctxt" in fields else msgid
+                entries.append((key, msgid))
+                if "msgid_plural" in fields:
+                    entries.append((key + "\x00", fields["msgid_plural"]))
+            plurals = sorted((name for name in fields
+                              if name.startswith("msgstr[")),
+                             key=lambda name: int(name[7:-1]))
+            document.append((head, key, plurals, block))
+        return document, entries
+
+    @staticmethod
+    def render(document, translations, target_lang):
+        blocks = []
+        for head, key, plurals, block in document:
+            if key is None:
+                blocks.append(_po_language.sub(
+                    '"Language: ' + target_lang + '\\\\n"', block))
+                continue
+            lines = list(head)
+            if plurals:
+                for index, plural in enumerate(plurals):
+                    lines += _po_lines(plural, translations[
+                        key + "\x00" if index else key])
+            else:
+                lines += _po_lines("msgstr", translations[key])
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks) + "\n"
+
+
+class SrtFormat(object):
+    """SrtFormat - SubRip subtitles, cue numbers and timings kept"""
+
+    extensions = (".srt",)
+
+    @staticmethod
+    def target_name(relative_path):
+        return relative_path
+
+    @staticmethod
+    def parse(text):
+        """
+        Returns (document, [(key, source text)])
+        >>> document, entries = SrtFormat.parse(
+        ...     "1\\n00:00:01,000 --> 00:00:02,000\\nHello\\nthere\\n")
+        >>> entries
+        [('1', 'Hello\\nthere')]
+        """
+        document, entries = [], []
+        blocks = _srt_block_break.split(text.replace("\r\n", "\n").strip())
+        for position, block in enumerate(blocks):
+            lines = block.split("\n")
+            if len(lines) >= 3 and "-->" in lines[1]:
+                key = str(position + 1)
+                entries.append((key, "\n".join(lines[2:])))
+                document.append((lines[:2], key))
+            else:
+                document.append(([block], None))
+        return document, entries
+
+    @staticmethod
+    def render(document, translations, target_lang):
+        return "\n\n".join("\n".join(head + ([translations[key]] if key
+                                             else []))
+                           for head, key in document) + "\n"
+
+
+class JsonFormat(object):
+    """JsonFormat - i18n JSON, every string value translated"""
+
+    extensions = (".json",)
+
+    @staticmethod
+    def target_name(relative_path):
+        return relative_path
+
+    @classmethod
+    def _walk(cls, value, path, entries):
+        if isinstance(value, str):
+            entries.append((path, value))
+        elif isinstance(value, dict):
+            for name, item in value.items():
+                if not name.startswith("@"):  # ARB metadata
+                    cls._walk(item, path + "/" + name, entries)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                cls._walk(item, path + "/" + str(index), entries)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Returns (document, [(key, source text)])
+        >>> document, entries = JsonFormat.parse(
+        ...     '{"menu": {"open": "Open", "@open": {"x": "y"}}, "n": 1}')
+        >>> entries
+        [('/menu/open', 'Open')]
+        >>> JsonFormat.render(document, {"/menu/open": "Öffnen"}, "de")
+        '{\\n  "menu": {\\n    "open": "Öffnen",\\n    "@open": {\\n\
+      "x": "y"\\n    }\\n  },\\n  "n": 1\\n}\\n'
+        """
+        entries = []
+        data = json.loads(text)
+        cls._walk(data, "", entries)
+        indent = re.match(r"\s*[{\[]\s*?\n([ \t]+)", text)
+        return (data, indent.group(1) if indent else "  "), entries
+
+    @classmethod
+    def _replace(cls, value, path, translations):
+        if isinstance(value, str):
+            return translations.get(path, value)
+        if isinstance(value, dict):
+            return {name: item if name.startswith("@") else
+                    cls._replace(item, path + "/" + name, translations)
+                    for name, item in value.items()}
+        if isinstance(value, list):
+            return [cls._replace(item, path + "/" + str(index), translations)
+                    for index, item in enumerate(value)]
+        return value
+
+    @classmethod
+    def render(cls, document, translations, target_lang):
+        data, indent = document
+        return json.dumps(cls._replace(data, "", translations),
+                          ensure_ascii=False, indent=indent) + "\n"
+
+
+FORMATS = (PoFormat, SrtFormat, JsonFormat)
+
+
+def find_format(path):
+    """Returns format class handling path (by extension), None if none"""
+    extension = os.path.splitext(path)[1].lower()
+    return next((file_format for file_format in FORMATS
+                 if extension in file_format.extensions), None)
+
+
+class TreeTranslator(object):
+    """TreeTranslator - Incremental translation of a tree of i18n files"""
+
+    checkpoint_interval = 2.0  # Seconds between manifest writes
+
+    def __init__(self, translator, source_root, target_root, source_lang,
+                 target_lang, jobs=4, batch_size=50, manifest_path=None):
+        """
+        Constructor for TreeTranslator - Files under source_root are
+        written translated at the same place under target_root. Source
+        hashes and translations of every entry are kept in a manifest
+        (Default: target_root/.babelPy-tree.<target_lang>.json), so only
+        new or changed entries are sent to translator, in batches of up
+        to batch_size, for up to jobs files at once.
+        """
+        self.translator = translator
+        self.source_root = source_root
+        self.target_root = target_root
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.manifest_path = manifest_path or os.path.join(
+            target_root, ".babelPy-tree." + target_lang + ".json")
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.saved_at = time.monotonic()
+        self.manifest = self._load_manifest()
+        self.stats = {"files": 0, "unchanged_files": 0, "failed_files": 0,
+                      "translated": 0, "reused": 0, "batches": 0}
+
+    def _load_manifest(self):
+        manifest = {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            pass
+        if manifest.get("languages") != [self.source_lang, self.target_lang]:
+            manifest = {"languages": [self.source_lang, self.target_lang],
+                        "files": {}}
+        return manifest
+
+    def save_manifest(self):
+        """Writes the manifest atomically (checkpoint)"""
+        with self.save_lock:
+            with self.lock:
+                data = json.dumps(self.manifest, ensure_ascii=False)
+                self.saved_at = time.monotonic()
+            os.makedirs(os.path.dirname(self.manifest_path) or ".",
+                        exist_ok=True)
+            temp_path = self.manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as manifest_file:
+                manifest_file.write(data)
+            os.replace(temp_path, self.manifest_path)
+
+    def _checkpoint(self):
+        if time.monotonic() - self.saved_at >= self.checkpoint_interval:
+            self.save_manifest()
+
+    def files(self):
+        """Yields paths (relative to source_root) of supported files"""
+        for directory, directories, names in os.walk(self.source_root):
+            directories[:] = sorted(name for name in directories
+                                    if not name.startswith("."))
+            for name in sorted(names):
+                if find_format(name):
+                    path = os.path.join(directory, name)
+                    yield os.path.relpath(path, self.source_root)
+
+    def translate_file(self, relative_path):
+        """Translates (changed entries of) one file, returns its stats"""
+        file_format = find_format(relative_path)
+        with open(os.path.join(self.source_root, relative_path),
+                  encoding="utf-8-sig") as source_file:
+            text = source_file.read()
+        target_path = os.path.join(self.target_root,
+                                   file_format.target_name(relative_path))
+        file_digest = _digest(text)
+        with self.lock:
+            record = self.manifest["files"].setdefault(
+                relative_path, {"digest": None, "entries": {}})
+            known = dict(record["entries"])
+        if record["digest"] == file_digest and os.path.exists(target_path):
+            return {"unchanged_files": 1}
+
+        document, entries = file_format.parse(text)
+        entry_digests = {key: _digest(source) for key, source in entries}
+        # By source digest, as keys (cue numbers, list indexes) shift when
+        # entries are inserted; the same key first, for PO contexts
+        by_digest = {digest: translation
+                     for digest, translation in known.values()}
+        translations = {key: known[key][1] if key in known and
+                        known[key][0] == entry_digests[key]
+                        else by_digest[entry_digests[key]]
+                        for key, source in entries
+                        if entry_digests[key] in by_digest}
+        reused = len(translations)
+        pending = list(dict.fromkeys(source for key, source in entries
+                                     if key not in translations))
+        translated_sources = {}
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            results = self.translator.translate_batch(batch, self.source_lang,
+                                                      self.target_lang)
+            translated_sources.update(
+                (source, translation)
+                for source, (translation, _) in zip(batch, results))
+            with self.lock:
+                # Checkpoint: finished batches survive an interruption
+                for key, source in entries:
+                    if source in translated_sources:
+                        record["entries"][key] = [entry_digests[key],
+                                                  translated_sources[source]]
+            self._checkpoint()
+        for key, source in entries:
+            if key not in translations:
+                translations[key] = translated_sources[source]
+
+        os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+        temp_path = target_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as target_file:
+            target_file.write(file_format.render(document, translations,
+                                                 self.target_lang))
+        os.replace(temp_path, target_path)
+        with self.lock:
+            record["entries"] = {key: [entry_digests[key], translations[key]]
+                                 for key, _ in entries}
+            record["digest"] = file_digest
+        return {"files": 1, "translated": len(pending), "reused": reused,
+                "batches": -(-len(pending) // self.batch_size)}
+
+    def _translate_file_safely(self, relative_path):
+        try:
+            return self.translate_file(relative_path), None
+        except (TranslateExceptionABC, OSError, ValueError) as exception:
+            return {"failed_files": 1}, "{0}: {1}".format(relative_path,
+                                                          exception)
+
+    def run(self, on_error=None):
+        """
+        Translates every supported file of the tree, returns stats dict
+        on_error(message) is called for each file that could not be done
+        """
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        futures = [executor.submit(self._translate_file_safely, path)
+                   for path in self.files()]
+        try:
+            for future in futures:
+                file_stats, error = future.result()
+                for stat_name, stat_value in file_stats.items():
+                    self.stats[stat_name] += stat_value
+                if error and on_error:
+                    on_error(error)
+                self._checkpoint()
+        finally:
+            # On interruption, files not started yet are left for next run
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.save_manifest()
+        return self.stats
@@ -0,0 +1,73 @@
+import hashlib
+import time
+import tkinter
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class SelectionWatcher(object):
+    """SelectionWatcher - Watches X11 selection/clipboard from one process"""
+
+    def __init__(self, on_change, source="selection", interval=0.1,
+                 debounce=0.3, root_tk=None):
+        """
+        Constructor for SelectionWatcher - on_change(text) is called once
+        the watched source ('selection' or 'clipboard') holds new content
+        that stayed unchanged for debounce seconds. Reads go through Tk's
+        in-process X11 connection, no subprocess is spawned per poll.
+        """
+        self.on_change = on_change
+        self.selection = "PRIMARY" if source == "selection" else "CLIPBOARD"
+        self.interval_ms = max(int(interval * 1000), 1)
+        self.debounce = debounce
+        self.root_tk = root_tk or tkinter.Tk()
+        self.root_tk.withdraw()
+        self.last_digest = None
+        self.pending = None  # (digest, text, first seen at)
+        self.ignored = set()
+
+    def read(self):
+        """Returns current content of the watched selection ("" if none)"""
+        try:
+            return self.root_tk.selection_get(selection=self.selection)
+        except tkinter.TclError:
+            return ""
+
+    def ignore(self, text):
+        """Skips given text the next time it shows up (e.g. pushed by us)"""
+        self.ignored.add(_digest(text))
+
+    def push_clipboard(self, text):
+        """Owns the CLIPBOARD with given text, without reacting to it"""
+        self.ignore(text)
+        self.root_tk.clipboard_clear()
+        self.root_tk.clipboard_append(text)
+
+    def poll(self):
+        """Checks the selection once, calling on_change when debounced"""
+        text = self.read()
+        digest = _digest(text)
+        now = time.monotonic()
+        if digest == self.last_digest:
+            self.pending = None
+        elif not self.pending or self.pending[0] != digest:
+            self.pending = digest, text, now
+        elif now - self.pending[2] >= self.debounce:
+            self.pending = None
+            self.last_digest = digest
+            if text.strip() and digest not in self.ignored:
+                self.on_change(text)
+            self.ignored.discard(digest)
+
+    def _tick(self):
+        self.poll()
+        self.root_tk.after(self.interval_ms, self._tick)
+
+    def run(self):
+        """Polls forever from the Tk event loop"""
+        # Content already selected when starting is not translated
+        self.last_digest = _digest(self.read())
+        self.root_tk.after(self.interval_ms, self._tick)
+        self.root_tk.mainloop()